@@ -0,0 +1,57 @@
+"""Benchmark scripts for the theatre API.
+
+Every benchmark runs against a throwaway test database created from the
+configured ``DATABASES`` settings, so it never touches real data::
+
+    python -m benchmarks.reservation_bulk
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_api_service.settings")
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat):
+    """Call ``func`` ``repeat`` times and return the timings in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def report(label, timings):
+    print(
+        f"{label:<40} "
+        f"mean={statistics.mean(timings) * 1000:8.2f}ms "
+        f"p50={percentile(timings, 50) * 1000:8.2f}ms "
+        f"p99={percentile(timings, 99) * 1000:8.2f}ms"
+    )
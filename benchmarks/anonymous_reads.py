@@ -0,0 +1,80 @@
+"""Anonymous catalogue GETs with and without eager authentication.
+
+Calls the play and performance list views directly, once as they are and
+once with the previous behaviour (authenticate every request and evaluate
+``request.user`` in ``IsAdminOrReadOnly``), and reports requests/s::
+
+    python -m benchmarks.anonymous_reads --repeat 2000
+"""
+import argparse
+import statistics
+
+from benchmarks import measure, report, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup()
+    from rest_framework.permissions import BasePermission, SAFE_METHODS
+    from rest_framework.test import APIRequestFactory
+
+    from theatre.models import Performance, Play, TheatreHall
+    from theatre.views import PerformanceApiViewSet, PlayApiViewSet
+
+    class PreviousIsAdminOrReadOnly(BasePermission):
+        def has_permission(self, request, view):
+            return bool(
+                (
+                    request.method in SAFE_METHODS
+                    and request.user
+                    or request.user.is_authenticated
+                )
+                or (request.user and request.user.is_staff)
+            )
+
+    def eager(viewset):
+        return type(
+            f"Eager{viewset.__name__}",
+            (viewset,),
+            {
+                "perform_authentication": lambda self, request: request.user,
+                "permission_classes": (PreviousIsAdminOrReadOnly,),
+            },
+        )
+
+    with test_database():
+        theatre_hall = TheatreHall.objects.create(
+            name="Bench Hall", rows=10, seats_in_row=20
+        )
+        for i in range(10):
+            play = Play.objects.create(title=f"Play {i}", description="Benchmark")
+            Performance.objects.create(
+                play=play, theatre_hall=theatre_hall, show_time="2030-01-01T19:00:00Z"
+            )
+
+        factory = APIRequestFactory()
+        for path, viewset in (
+            ("/api/theatre/plays/", PlayApiViewSet),
+            ("/api/theatre/performances/", PerformanceApiViewSet),
+        ):
+            for label, view_class in (
+                ("eager auth", eager(viewset)),
+                ("lazy auth", viewset),
+            ):
+                view = view_class.as_view({"get": "list"})
+
+                def get():
+                    response = view(factory.get(path))
+                    response.render()
+
+                get()
+                timings = measure(get, args.repeat)
+                report(f"{path} {label}", timings)
+                print(f"{'':<40} {1 / statistics.mean(timings):8.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Bytes and CPU saved by conditional GETs on the play list.
+
+Polls ``/api/theatre/plays/`` with and without ``If-None-Match`` and
+reports response bytes and process CPU time per request::
+
+    python -m benchmarks.conditional_get --plays 20 --repeat 200
+"""
+import argparse
+import time
+
+from benchmarks import setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plays", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    setup()
+    from rest_framework.test import APIClient
+
+    from theatre.models import Actor, Genre, Play
+
+    with test_database():
+        genres = [Genre.objects.create(name=f"Genre {i}") for i in range(5)]
+        actors = [
+            Actor.objects.create(first_name="Actor", last_name=str(i))
+            for i in range(10)
+        ]
+        for i in range(args.plays):
+            play = Play.objects.create(
+                title=f"Play {i}", description="A rather long description " * 10
+            )
+            play.genres.set(genres)
+            play.actors.set(actors)
+
+        client = APIClient()
+        url = f"/api/theatre/plays/?page_size={args.plays}"
+        # Warms the response cache, so full GETs measure the cheapest
+        # path that still renders and sends the body.
+        etag = client.get(url)["ETag"]
+
+        for label, headers in (
+            ("full GET", {}),
+            ("conditional GET (304)", {"HTTP_IF_NONE_MATCH": etag}),
+        ):
+            total_bytes = 0
+            cpu_start = time.process_time()
+            for _ in range(args.repeat):
+                response = client.get(url, **headers)
+                total_bytes += len(response.content)
+            cpu = time.process_time() - cpu_start
+            print(
+                f"{label:<25} status={response.status_code} "
+                f"bytes/request={total_bytes / args.repeat:10.1f} "
+                f"cpu/request={cpu / args.repeat * 1000:7.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
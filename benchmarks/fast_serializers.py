@@ -0,0 +1,141 @@
+"""DRF serializers versus the ``.values()`` serializers for list pages.
+
+Serializes and renders 10/100/1000 plays, performances and reservations
+with both paths, queries included::
+
+    python -m benchmarks.fast_serializers --repeat 20
+"""
+import argparse
+
+from benchmarks import measure, report, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth import get_user_model
+    from rest_framework.renderers import JSONRenderer
+
+    from theatre.fast_serializers import (
+        PerformanceListValuesSerializer,
+        PlayDetailValuesSerializer,
+        ReservationListValuesSerializer,
+    )
+    from theatre.models import (
+        Actor,
+        Genre,
+        Performance,
+        Play,
+        Reservation,
+        TheatreHall,
+        Ticket,
+    )
+    from theatre.serializers import (
+        PerformanceListSerializer,
+        PlayDetailSerializer,
+        ReservationListSerializer,
+    )
+
+    rows = max(args.rows)
+    with test_database():
+        user = get_user_model().objects.create_user(
+            email="bench@example.com", password="benchpass"
+        )
+        genres = Genre.objects.bulk_create(
+            [Genre(name=f"Genre {i}") for i in range(5)]
+        )
+        actors = Actor.objects.bulk_create(
+            [Actor(first_name="Actor", last_name=str(i)) for i in range(10)]
+        )
+        theatre_hall = TheatreHall.objects.create(
+            name="Bench Hall", rows=20, seats_in_row=30
+        )
+        plays = Play.objects.bulk_create(
+            [Play(title=f"Play {i}", description="Description") for i in range(rows)]
+        )
+        Play.genres.through.objects.bulk_create(
+            [
+                Play.genres.through(play=play, genre=genre)
+                for play in plays
+                for genre in genres[:3]
+            ]
+        )
+        Play.actors.through.objects.bulk_create(
+            [
+                Play.actors.through(play=play, actor=actor)
+                for play in plays
+                for actor in actors[:4]
+            ]
+        )
+        performances = Performance.objects.bulk_create(
+            [
+                Performance(
+                    play=play,
+                    theatre_hall=theatre_hall,
+                    show_time="2030-01-01T19:00:00Z",
+                )
+                for play in plays
+            ]
+        )
+        reservations = Reservation.objects.bulk_create(
+            [Reservation(user=user) for _ in range(rows)]
+        )
+        Ticket.objects.bulk_create(
+            [
+                Ticket(
+                    reservation=reservation, performance=performance, row=1, seat=seat
+                )
+                for reservation, performance in zip(reservations, performances)
+                for seat in range(1, 4)
+            ]
+        )
+
+        play_queryset = Play.objects.prefetch_related("genres", "actors")
+        performance_queryset = (
+            Performance.objects.select_related("play", "theatre_hall")
+            .prefetch_related("play__genres", "play__actors")
+            .with_tickets_available()
+        )
+        reservation_queryset = Reservation.objects.prefetch_related(
+            "tickets",
+            "tickets__performance__play",
+            "tickets__performance__theatre_hall",
+        )
+        renderer = JSONRenderer()
+        cases = (
+            ("plays", play_queryset, PlayDetailSerializer, PlayDetailValuesSerializer),
+            (
+                "performances",
+                performance_queryset,
+                PerformanceListSerializer,
+                PerformanceListValuesSerializer,
+            ),
+            (
+                "reservations",
+                reservation_queryset,
+                ReservationListSerializer,
+                ReservationListValuesSerializer,
+            ),
+        )
+        for name, queryset, serializer_class, values_serializer_class in cases:
+            for count in args.rows:
+                def drf():
+                    data = serializer_class(queryset.all()[:count], many=True).data
+                    return renderer.render(data)
+
+                def values():
+                    serializer = values_serializer_class()
+                    data = serializer.serialize(serializer.prepare(queryset)[:count])
+                    return renderer.render(data)
+
+                assert drf() == values()
+                report(f"{name} x{count:<5} DRF serializer", measure(drf, args.repeat))
+                report(f"{name} x{count:<5} values() serializer", measure(values, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
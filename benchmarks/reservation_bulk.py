@@ -0,0 +1,77 @@
+"""Reservation latency versus ticket count.
+
+Compares the batched ticket insert used by ``ReservationSerializer.create``
+with the previous one-INSERT-per-ticket loop::
+
+    python -m benchmarks.reservation_bulk --repeat 50
+"""
+import argparse
+
+from benchmarks import measure, report, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument(
+        "--tickets", type=int, nargs="+", default=[1, 5, 10, 20, 50]
+    )
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from theatre.models import Performance, Play, Reservation, TheatreHall, Ticket
+    from theatre.serializers import ReservationSerializer
+
+    class PerRowReservationSerializer(ReservationSerializer):
+        def create(self, validated_data):
+            with transaction.atomic():
+                tickets_data = validated_data.pop("tickets")
+                reservation = Reservation.objects.create(**validated_data)
+                for ticket_data in tickets_data:
+                    Ticket.objects.create(reservation=reservation, **ticket_data)
+                return reservation
+
+    with test_database():
+        user = get_user_model().objects.create_user(
+            email="bench@example.com", password="benchpass"
+        )
+        theatre_hall = TheatreHall.objects.create(
+            name="Bench Hall", rows=max(args.tickets), seats_in_row=100
+        )
+        play = Play.objects.create(title="Bench", description="Benchmark")
+        performance = Performance.objects.create(
+            play=play, theatre_hall=theatre_hall, show_time="2030-01-01T19:00:00Z"
+        )
+
+        for count in args.tickets:
+            payload = {
+                "tickets": [
+                    {"row": row, "seat": 1, "performance": performance.id}
+                    for row in range(1, count + 1)
+                ]
+            }
+
+            def reserve(serializer_class):
+                def run():
+                    serializer = serializer_class(data=payload)
+                    serializer.is_valid(raise_exception=True)
+                    serializer.save(user=user)
+                    Reservation.objects.all().delete()
+
+                return run
+
+            report(
+                f"{count:>3} tickets, per-row INSERT",
+                measure(reserve(PerRowReservationSerializer), args.repeat),
+            )
+            report(
+                f"{count:>3} tickets, bulk INSERT",
+                measure(reserve(ReservationSerializer), args.repeat),
+            )
+
+
+if __name__ == "__main__":
+    main()
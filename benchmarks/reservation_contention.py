@@ -0,0 +1,127 @@
+"""Concurrent reservations for one performance under each locking strategy.
+
+Fires ``--requests`` reservation requests from ``--concurrency`` threads,
+each asking for ``--seats`` random seats out of a small pool so that
+requests collide, and reports throughput, latency and whether any seat
+was sold twice::
+
+    python -m benchmarks.reservation_contention --requests 500 --concurrency 50
+
+Meant for PostgreSQL; SQLite serializes all writes and the ``advisory``
+strategy is a no-op there. The ``seats`` strategy runs with
+``SEAT_INVENTORY`` on.
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import percentile, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=30)
+    parser.add_argument("--seats", type=int, default=2)
+    parser.add_argument(
+        "--pool", type=int, default=200, help="Number of seats requests pick from"
+    )
+    parser.add_argument("--strategies", nargs="+")
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth import get_user_model
+    from django.db import connections
+    from django.db.models import Count
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from theatre.locking import LOCKING_STRATEGIES
+    from theatre.models import (
+        Performance,
+        PerformanceSeat,
+        Play,
+        Reservation,
+        TheatreHall,
+        Ticket,
+    )
+
+    with test_database():
+        user = get_user_model().objects.create_user(
+            email="bench@example.com", password="benchpass"
+        )
+        seats_in_row = 20
+        theatre_hall = TheatreHall.objects.create(
+            name="Bench Hall",
+            rows=-(-args.pool // seats_in_row),
+            seats_in_row=seats_in_row,
+        )
+        play = Play.objects.create(title="Bench", description="Benchmark")
+        performance = Performance.objects.create(
+            play=play, theatre_hall=theatre_hall, show_time="2030-01-01T19:00:00Z"
+        )
+        PerformanceSeat.generate([performance])
+        url = reverse("theatre:reservation-list")
+
+        def reserve(seats):
+            client = APIClient()
+            client.force_authenticate(user)
+            payload = {
+                "tickets": [
+                    {
+                        "row": seat // seats_in_row + 1,
+                        "seat": seat % seats_in_row + 1,
+                        "performance": performance.id,
+                    }
+                    for seat in seats
+                ]
+            }
+            start = time.perf_counter()
+            try:
+                status_code = client.post(url, payload, format="json").status_code
+            except Exception as exc:
+                status_code = type(exc).__name__
+            finally:
+                connections.close_all()
+            return status_code, time.perf_counter() - start
+
+        for strategy in args.strategies or LOCKING_STRATEGIES:
+            Reservation.objects.all().delete()
+            PerformanceSeat.objects.update(sold=False)
+            rng = random.Random(0)
+            requests = [
+                rng.sample(range(args.pool), args.seats) for _ in range(args.requests)
+            ]
+            with override_settings(
+                RESERVATION_LOCKING=strategy, SEAT_INVENTORY=strategy == "seats"
+            ):
+                start = time.perf_counter()
+                with ThreadPoolExecutor(args.concurrency) as executor:
+                    results = list(executor.map(reserve, requests))
+                elapsed = time.perf_counter() - start
+
+            statuses = Counter(status_code for status_code, _ in results)
+            timings = [timing for _, timing in results]
+            double_booked = (
+                Ticket.objects.values("performance", "row", "seat")
+                .annotate(count=Count("id"))
+                .filter(count__gt=1)
+                .count()
+            )
+            print(
+                f"{strategy:<12} "
+                f"{len(results) / elapsed:8.1f} req/s "
+                f"mean={statistics.mean(timings) * 1000:8.2f}ms "
+                f"p99={percentile(timings, 99) * 1000:8.2f}ms "
+                f"tickets={Ticket.objects.count():<5} "
+                f"double_booked={double_booked} "
+                f"statuses={dict(sorted(statuses.items(), key=str))}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Request handling cost of the development and production settings profiles.
+
+Runs itself once per ``DJANGO_ENV`` in a fresh process (settings are read
+at start-up) and sends requests through the full WSGI handler and
+middleware with the test client, so the development run pays for DEBUG
+query logging and the debug toolbar's instrumentation::
+
+    python -m benchmarks.serving_profiles --repeat 500
+
+On PostgreSQL the production run also keeps its connection between
+requests (CONN_MAX_AGE) instead of reconnecting per request.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks import measure, report, setup, test_database
+
+PROFILES = ("development", "production")
+
+
+def run_profile(repeat):
+    setup()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import Client, override_settings
+
+    from theatre.models import Performance, Play, Reservation, TheatreHall, Ticket
+    from user.serializers import ClaimsTokenObtainPairSerializer
+
+    # setup_test_environment() switches DEBUG off; keep the profile's value.
+    debug = settings.DEBUG
+    with test_database(), override_settings(DEBUG=debug):
+        user = get_user_model().objects.create_user(
+            email="bench@example.com", password="benchpass"
+        )
+        theatre_hall = TheatreHall.objects.create(
+            name="Bench Hall", rows=10, seats_in_row=20
+        )
+        for i in range(10):
+            play = Play.objects.create(title=f"Play {i}", description="Benchmark")
+            performance = Performance.objects.create(
+                play=play, theatre_hall=theatre_hall, show_time="2030-01-01T19:00:00Z"
+            )
+            reservation = Reservation.objects.create(user=user)
+            Ticket.objects.create(
+                reservation=reservation, performance=performance, row=1, seat=1
+            )
+        access = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+
+        print(
+            f"DJANGO_ENV={settings.DJANGO_ENV} DEBUG={debug} "
+            f"middleware={len(settings.MIDDLEWARE)} "
+            f"CONN_MAX_AGE={settings.DATABASES['default']['CONN_MAX_AGE']}"
+        )
+        client = Client(HTTP_ACCEPT="application/json")
+        for path, headers in (
+            ("/api/theatre/plays/", {}),
+            ("/api/theatre/performances/", {}),
+            (
+                "/api/theatre/reservations/",
+                {"HTTP_AUTHORIZATION": f"Bearer {access}"},
+            ),
+        ):
+
+            def get():
+                response = client.get(path, **headers)
+                assert response.status_code == 200, response.status_code
+
+            get()
+            timings = measure(get, repeat)
+            report(path, timings)
+            print(f"{'':<40} {1 / statistics.mean(timings):8.0f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--profile", choices=PROFILES)
+    args = parser.parse_args()
+
+    if args.profile:
+        run_profile(args.repeat)
+        return
+    for profile in PROFILES:
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.serving_profiles",
+                "--repeat",
+                str(args.repeat),
+                "--profile",
+                profile,
+            ],
+            env={
+                "DJANGO_ALLOWED_HOSTS": "testserver",
+                **os.environ,
+                "DJANGO_ENV": profile,
+            },
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Token issuance under brute-force-like traffic, with and without throttles.
+
+Replays a mix of requests against the token view: most come from one
+attacker IP guessing passwords for a victim's email and spraying other
+emails, the rest are users logging in from their own IP. Reports
+requests/s, tokens issued/s and the latency of each outcome::
+
+    python -m benchmarks.token_issuance --requests 500 --attack-ratio 0.9
+"""
+import argparse
+import collections
+import random
+import time
+
+from benchmarks import report, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--attack-ratio", type=float, default=0.9)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=100_000,
+        help="PBKDF2 iterations for the benchmark users",
+    )
+    args = parser.parse_args()
+
+    setup()
+    from django.core.cache import cache
+    from django.test import override_settings
+    from rest_framework.test import APIRequestFactory
+
+    from user.models import User
+    from user.views import ThrottledTokenObtainPairView
+
+    random.seed(0)
+    traffic = []
+    for i in range(args.requests):
+        if random.random() < args.attack_ratio:
+            email = random.choice(["victim@example.com", f"guess{i}@example.com"])
+            traffic.append(("attack", "10.66.0.1", email, f"guess{i}"))
+        else:
+            user = random.randrange(args.users)
+            traffic.append(
+                ("login", f"10.0.{user}.1", f"user{user}@example.com", "userpass")
+            )
+
+    with test_database(), override_settings(
+        PASSWORD_PBKDF2_ITERATIONS=args.iterations
+    ):
+        User.objects.create_user(email="victim@example.com", password="victimpass")
+        for user in range(args.users):
+            User.objects.create_user(
+                email=f"user{user}@example.com", password="userpass"
+            )
+
+        factory = APIRequestFactory()
+        for label, throttle_classes in (
+            ("unthrottled", ()),
+            ("token buckets", ThrottledTokenObtainPairView.throttle_classes),
+        ):
+            cache.clear()
+            view = ThrottledTokenObtainPairView.as_view(
+                throttle_classes=throttle_classes
+            )
+            timings = collections.defaultdict(list)
+            statuses = collections.Counter()
+            start = time.perf_counter()
+            for kind, ip, email, password in traffic:
+                request = factory.post(
+                    "/api/user/token/",
+                    {"email": email, "password": password},
+                    format="json",
+                    REMOTE_ADDR=ip,
+                )
+                request_start = time.perf_counter()
+                response = view(request)
+                timings[(kind, response.status_code)].append(
+                    time.perf_counter() - request_start
+                )
+                statuses[(kind, response.status_code)] += 1
+            elapsed = time.perf_counter() - start
+
+            issued = sum(
+                count for (kind, code), count in statuses.items() if code == 200
+            )
+            print(
+                f"{label}: {len(traffic) / elapsed:.0f} req/s, "
+                f"{issued / elapsed:.1f} tokens/s, "
+                f"statuses={dict(sorted(statuses.items()))}"
+            )
+            for (kind, code), values in sorted(timings.items()):
+                report(f"  {kind} {code}", values)
+            print(
+                f"  {'':<38} total {elapsed:.2f}s, "
+                f"logins issued {statuses[('login', 200)]} "
+                f"of {sum(1 for request in traffic if request[0] == 'login')}"
+            )
+
+
+if __name__ == "__main__":
+    main()
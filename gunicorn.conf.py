@@ -0,0 +1,57 @@
+"""gunicorn settings for the production profile (DJANGO_ENV=production).
+
+gunicorn reads this file from the working directory::
+
+    gunicorn theatre_api_service.wsgi
+
+Run ``manage.py collectstatic`` first and serve STATIC_ROOT from the
+reverse proxy; gunicorn only serves the application.
+
+Every value can be overridden from the environment. For ASGI, install
+uvicorn and run ``theatre_api_service.asgi`` with
+GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+workers = int(
+    os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+worker_class = os.environ.get(
+    "GUNICORN_WORKER_CLASS", "gthread" if threads > 1 else "sync"
+)
+
+# Seconds before a silent worker is killed and restarted, before workers
+# finish their requests on restart, and to wait for the next request on a
+# keep-alive connection.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 2))
+
+# Recycle workers now and then so leaks cannot grow without bound.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """Refuse to run several workers on per-process LocMemCache.
+
+    Cache version stamps, cached responses and counts, seat maps and the
+    login throttle buckets must be shared by every worker, or writes seen
+    by one worker leave the others serving stale data.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_api_service.settings")
+    from django.conf import settings
+
+    backend = settings.CACHES["default"]["BACKEND"]
+    if server.cfg.workers > 1 and backend.endswith(".LocMemCache"):
+        raise RuntimeError(
+            f"{server.cfg.workers} workers would each keep their own "
+            "LocMemCache; set REDIS_URL or run GUNICORN_WORKERS=1"
+        )
@@ -0,0 +1,118 @@
+"""Bulk create and bulk update for the admin viewsets.
+
+A list payload posted to the list route is created with one
+``bulk_create``; ``PATCH <list route>/bulk/`` applies partial updates,
+each item carrying its ``id``, with one ``bulk_update``. The whole batch
+is validated first and nothing is written if any item is invalid; the
+400 response is then a list of errors aligned with the payload, ``{}``
+for the valid items. Both are restricted to admin users, whatever the
+viewset's own permissions allow for single objects.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from theatre.cache import invalidate
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """``many=True`` serializer that inserts all items in one statement."""
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        try:
+            with transaction.atomic():
+                instances = model.objects.bulk_create(
+                    [model(**attrs) for attrs in validated_data]
+                )
+        except IntegrityError as exc:
+            raise ValidationError({"non_field_errors": [str(exc)]})
+        # bulk_create sends no post_save signals.
+        invalidate(model)
+        return instances
+
+
+def check_batch(data):
+    if not isinstance(data, list) or not data:
+        raise ValidationError(
+            {"non_field_errors": ["Expected a non-empty list of items."]}
+        )
+    if len(data) > settings.BULK_MAX_ITEMS:
+        raise ValidationError(
+            {
+                "non_field_errors": [
+                    f"Ensure there are no more than {settings.BULK_MAX_ITEMS} items."
+                ]
+            }
+        )
+
+
+class BulkModelMixin:
+    """Adds list payloads to ``create`` and a ``bulk`` PATCH action.
+
+    The serializer needs ``list_serializer_class = BulkListSerializer``.
+    """
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        if not IsAdminUser().has_permission(request, self):
+            self.permission_denied(request)
+        check_batch(request.data)
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=False,
+        methods=["patch"],
+        url_path="bulk",
+        permission_classes=(IsAdminUser,),
+    )
+    def bulk_update(self, request):
+        """Partially update several objects, each item with its ``id``."""
+        check_batch(request.data)
+        model = self.get_queryset().model
+        ids = [
+            item.get("id") if isinstance(item, dict) else None for item in request.data
+        ]
+        instances = self.get_queryset().in_bulk(
+            [pk for pk in ids if isinstance(pk, int)]
+        )
+
+        items, errors, seen = [], [], set()
+        for pk, item in zip(ids, request.data):
+            if not isinstance(pk, int):
+                errors.append({"id": ["A valid integer is required."]})
+                continue
+            if pk in seen:
+                errors.append({"id": ["Duplicate id in the batch."]})
+                continue
+            seen.add(pk)
+            if pk not in instances:
+                errors.append({"id": ["Not found."]})
+                continue
+            serializer = self.get_serializer(instances[pk], data=item, partial=True)
+            errors.append({} if serializer.is_valid() else serializer.errors)
+            items.append(serializer)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        fields = set()
+        for serializer in items:
+            for field, value in serializer.validated_data.items():
+                setattr(serializer.instance, field, value)
+                fields.add(field)
+        if fields:
+            with transaction.atomic():
+                model.objects.bulk_update(
+                    [serializer.instance for serializer in items], sorted(fields)
+                )
+            # bulk_update sends no post_save signals either.
+            invalidate(model)
+        return Response([serializer.data for serializer in items])
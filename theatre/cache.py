@@ -0,0 +1,151 @@
+"""Per-model version stamps for cached theatre data.
+
+Anything cached from a model's table is keyed by the model's current
+version, so bumping the version on writes invalidates every dependent
+entry at once without having to find and delete them. Versions are
+nanosecond timestamps of the last write, which also makes them usable
+as modification times.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+HITS_KEY = "theatre:response_cache:hits"
+MISSES_KEY = "theatre:response_cache:misses"
+
+
+def version_key(model):
+    return f"theatre:version:{model._meta.label_lower}"
+
+
+def get_versions(*models):
+    """Return the current version of every model, in the given order."""
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*models):
+    cache.set_many({version_key(model): time.time_ns() for model in models}, None)
+
+
+def invalidate(*models):
+    """Invalidate cached data of ``models`` now and again after commit.
+
+    The second bump drops anything a concurrent request cached from data
+    read before this transaction committed.
+    """
+    bump_versions(*models)
+    transaction.on_commit(lambda: bump_versions(*models))
+
+
+def _increment(key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter was evicted between add() and incr().
+        cache.add(key, 1, None)
+
+
+def get_stats():
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counters.get(HITS_KEY, 0), counters.get(MISSES_KEY, 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / (hits + misses) if hits + misses else None,
+    }
+
+
+class CachedResponseMixin:
+    """Read-through cache for ``list`` and ``retrieve`` responses.
+
+    Responses are cached by URL and query parameters under the current
+    versions of ``cache_dependencies``, so any write to those models
+    invalidates them.
+    """
+
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_response_cache_key(self, request):
+        versions = ":".join(
+            str(version) for version in get_versions(*self.cache_dependencies)
+        )
+        query = sorted(request.query_params.lists())
+        url = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+        return f"theatre:response:{versions}:{url}"
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            _increment(HITS_KEY)
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        _increment(MISSES_KEY)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class ConditionalGetMixin:
+    """ETag / Last-Modified support for ``list`` and ``retrieve``.
+
+    Both validators are derived from the versions of ``cache_dependencies``
+    without touching the database, so matching ``If-None-Match`` and
+    ``If-Modified-Since`` requests get a 304 before any query or
+    serialization happens. ``Last-Modified`` is only sent once the latest
+    write is in an earlier second than the request.
+    """
+
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(*self.cache_dependencies)
+        representation = (
+            f"{versions}:{request.get_full_path()}:{request.accepted_media_type}"
+        )
+        etag = f'"{hashlib.md5(representation.encode()).hexdigest()}"'
+        last_modified = max(versions) // 1_000_000_000
+        if last_modified >= time.time_ns() // 1_000_000_000:
+            # Last-Modified has one-second resolution: a write later in this
+            # second would keep the same value and If-Modified-Since would
+            # answer 304 for changed data. Leave it to the ETag until then.
+            last_modified = None
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
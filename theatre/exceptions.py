@@ -0,0 +1,15 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SeatConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the requested seats are already taken."
+    default_code = "seat_taken"
+
+    def __init__(self, seats):
+        super().__init__()
+        self.seats = [
+            {"performance": performance, "row": row, "seat": seat}
+            for performance, row, seat in sorted(seats)
+        ]
@@ -0,0 +1,216 @@
+"""Read-only list serialization straight from ``.values()`` rows.
+
+Each serializer here mirrors one DRF serializer and produces the same
+data, key order included, so the rendered JSON is byte-identical. The
+field plan (output key, ``values()`` lookup, converter) is built once per
+class instead of per row, and no model instances or per-field serializer
+objects are created. Nested collections are fetched with the same queries
+``prefetch_related`` would run so that their order matches as well.
+
+Any change to the mirrored serializers must be repeated here;
+``theatre/tests/test_fast_serializers.py`` compares both paths.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.response import Response
+
+from theatre.models import Actor, Genre, Performance, Ticket
+
+
+def datetime_to_representation(value):
+    """Same output as ``serializers.DateTimeField`` with ISO 8601 format."""
+    if value is None:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def related_rows(model, lookup, parent_ids, columns):
+    """Group ``columns`` of ``model`` rows by the parent id reached via ``lookup``."""
+    grouped = defaultdict(list)
+    rows = model.objects.filter(**{f"{lookup}__in": parent_ids}).values_list(
+        lookup, *columns
+    )
+    for parent_id, *values in rows:
+        grouped[parent_id].append(values)
+    return grouped
+
+
+class ValuesSerializer:
+    # (output key, values() lookup, converter or None)
+    fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.lookups = tuple(lookup for _, lookup, _ in cls.fields)
+
+    def prepare(self, queryset):
+        """Turn the viewset queryset into a ``values()`` queryset of the plan."""
+        return queryset.prefetch_related(None).values(*self.lookups)
+
+    def serialize(self, rows):
+        rows = list(rows)
+        related = self.fetch_related(rows)
+        return [self.to_representation(row, related) for row in rows]
+
+    def fetch_related(self, rows):
+        return None
+
+    def to_representation(self, row, related):
+        return {
+            key: converter(row[lookup]) if converter else row[lookup]
+            for key, lookup, converter in self.fields
+        }
+
+
+class PlayDetailValuesSerializer(ValuesSerializer):
+    """Mirrors ``PlayDetailSerializer``."""
+
+    fields = (
+        ("id", "id", None),
+        ("title", "title", None),
+        ("description", "description", None),
+    )
+
+    def fetch_related(self, rows):
+        play_ids = [row["id"] for row in rows]
+        return (
+            related_rows(Genre, "plays", play_ids, ("id", "name")),
+            related_rows(Actor, "plays", play_ids, ("id", "first_name", "last_name")),
+        )
+
+    def to_representation(self, row, related):
+        genres, actors = related
+        data = super().to_representation(row, related)
+        data["genres"] = [
+            {"id": genre_id, "name": name} for genre_id, name in genres[row["id"]]
+        ]
+        data["actors"] = [
+            {
+                "id": actor_id,
+                "first_name": first_name,
+                "last_name": last_name,
+                "full_name": f"{first_name} {last_name}",
+            }
+            for actor_id, first_name, last_name in actors[row["id"]]
+        ]
+        return data
+
+
+class PerformanceListValuesSerializer(ValuesSerializer):
+    """Mirrors ``PerformanceListSerializer``."""
+
+    fields = (
+        ("id", "id", None),
+        ("tickets_available", "tickets_available", None),
+        ("show_time", "show_time", datetime_to_representation),
+        ("tickets_sold", "tickets_sold", None),
+    )
+    play_fields = (
+        ("id", "play__id"),
+        ("title", "play__title"),
+        ("description", "play__description"),
+    )
+    theatre_hall_fields = (
+        ("id", "theatre_hall__id"),
+        ("name", "theatre_hall__name"),
+        ("rows", "theatre_hall__rows"),
+        ("seats_in_row", "theatre_hall__seats_in_row"),
+    )
+
+    def prepare(self, queryset):
+        return queryset.prefetch_related(None).values(
+            *self.lookups,
+            *(lookup for _, lookup in self.play_fields),
+            *(lookup for _, lookup in self.theatre_hall_fields),
+        )
+
+    def fetch_related(self, rows):
+        play_ids = {row["play__id"] for row in rows}
+        return (
+            related_rows(Genre, "plays", play_ids, ("id",)),
+            related_rows(Actor, "plays", play_ids, ("id",)),
+        )
+
+    def to_representation(self, row, related):
+        genres, actors = related
+        data = super().to_representation(row, related)
+        play = {key: row[lookup] for key, lookup in self.play_fields}
+        play["genres"] = [genre_id for genre_id, in genres[play["id"]]]
+        play["actors"] = [actor_id for actor_id, in actors[play["id"]]]
+        return {
+            "id": data["id"],
+            "play": play,
+            "theatre_hall": {
+                key: row[lookup] for key, lookup in self.theatre_hall_fields
+            },
+            "tickets_available": data["tickets_available"],
+            "show_time": data["show_time"],
+            "tickets_sold": data["tickets_sold"],
+        }
+
+
+class ReservationListValuesSerializer(ValuesSerializer):
+    """Mirrors ``ReservationListSerializer``."""
+
+    fields = (
+        ("id", "id", None),
+        ("created_at", "created_at", datetime_to_representation),
+    )
+
+    def fetch_related(self, rows):
+        tickets = related_rows(
+            Ticket,
+            "reservation",
+            [row["id"] for row in rows],
+            ("row", "seat", "performance_id"),
+        )
+        performances = {
+            performance_id: (title, theatre_hall_name)
+            for performance_id, title, theatre_hall_name in Performance.objects.filter(
+                id__in={
+                    performance_id
+                    for reservation_tickets in tickets.values()
+                    for _, _, performance_id in reservation_tickets
+                }
+            ).values_list("id", "play__title", "theatre_hall__name")
+        }
+        return tickets, performances
+
+    def to_representation(self, row, related):
+        tickets, performances = related
+        data = super().to_representation(row, related)
+        data["tickets"] = [
+            {
+                "row": ticket_row,
+                "seat": seat,
+                "performance_play_title": performances[performance_id][0],
+                "theatre_hall": performances[performance_id][1],
+            }
+            for ticket_row, seat, performance_id in tickets[row["id"]]
+        ]
+        return data
+
+
+class FastListMixin:
+    """Serve ``list`` through ``fast_serializer_class`` when enabled.
+
+    The ``FAST_READ_SERIALIZERS`` setting switches the mode on.
+    """
+
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_READ_SERIALIZERS or self.fast_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.fast_serializer_class()
+        queryset = serializer.prepare(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))
@@ -0,0 +1,89 @@
+"""Locking strategies for the reservation write path.
+
+``RESERVATION_LOCKING`` selects one of:
+
+``none``
+    No explicit lock; the unique seat constraint rejects double bookings
+    and conflicting requests are retried or answered with 409.
+``advisory``
+    A transaction-level PostgreSQL advisory lock per performance, so
+    reservations for one performance run one at a time without touching
+    any table row. A no-op on other databases.
+``performance``
+    ``SELECT ... FOR UPDATE`` on the performance rows, the portable
+    variant of ``advisory``.
+``seats``
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` on the free seat inventory rows
+    (``SEAT_INVENTORY``). Reservations of different seats never wait for
+    each other, and a seat that is sold or being reserved right now is
+    reported as a conflict at once instead of after a failed insert.
+
+Performance locks are taken in id order so two reservations spanning the
+same performances can not deadlock.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+from theatre.exceptions import SeatConflict
+from theatre.models import Performance, PerformanceSeat, seats_filter
+
+LOCKING_STRATEGIES = ("none", "advisory", "performance", "seats")
+
+# First key of the two-key advisory lock, keeping these locks apart from
+# any other advisory lock taken on the database.
+ADVISORY_LOCK_NAMESPACE = 4242
+
+
+def advisory_lock_key(performance_id):
+    """The int4 second key for ``performance_id``.
+
+    pg_advisory_xact_lock(int4, int4) has no bigint pair form, so ids are
+    wrapped into the int4 range. Ids 2**32 apart share a lock, which only
+    serializes their reservations, never lets two run at once.
+    """
+    return (performance_id + 2**31) % 2**32 - 2**31
+
+
+def lock_seats(tickets):
+    """Lock what the ``tickets`` about to be inserted need, for the transaction."""
+    strategy = settings.RESERVATION_LOCKING
+    if strategy not in LOCKING_STRATEGIES:
+        raise ImproperlyConfigured(
+            f"RESERVATION_LOCKING must be one of {', '.join(LOCKING_STRATEGIES)}"
+        )
+    if strategy == "seats" and not settings.SEAT_INVENTORY:
+        raise ImproperlyConfigured("RESERVATION_LOCKING=seats needs SEAT_INVENTORY")
+    performance_ids = sorted({ticket.performance_id for ticket in tickets})
+
+    if strategy == "advisory" and connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            for performance_id in performance_ids:
+                cursor.execute(
+                    "SELECT pg_advisory_xact_lock(%s::integer, %s::integer)",
+                    [ADVISORY_LOCK_NAMESPACE, advisory_lock_key(performance_id)],
+                )
+    elif strategy == "performance":
+        list(
+            Performance.objects.select_for_update()
+            .filter(id__in=performance_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+    elif strategy == "seats":
+        requested = {
+            (ticket.performance_id, ticket.row, ticket.seat) for ticket in tickets
+        }
+        locked = set(
+            PerformanceSeat.objects.select_for_update(skip_locked=True)
+            .filter(
+                seats_filter(
+                    {"performance": performance_id, "row": row, "seat": seat}
+                    for performance_id, row, seat in requested
+                ),
+                sold=False,
+            )
+            .values_list("performance_id", "row", "seat")
+        )
+        if locked != requested:
+            raise SeatConflict(requested - locked)
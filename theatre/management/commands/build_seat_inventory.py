@@ -0,0 +1,43 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from theatre.models import Performance, PerformanceSeat, Ticket
+
+
+class Command(BaseCommand):
+    """Django command to build the seat inventory of existing performances.
+
+    Run it once before turning ``SEAT_INVENTORY`` on; performances that
+    already have an inventory are left alone.
+    """
+
+    help = "Build the seat inventory of performances that have none"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        missing = Performance.objects.filter(
+            ~Exists(PerformanceSeat.objects.filter(performance=OuterRef("pk")))
+        ).order_by("id")
+        built = 0
+        while True:
+            with transaction.atomic():
+                performances = list(missing[: options["batch_size"]])
+                if not performances:
+                    break
+                PerformanceSeat.generate(performances)
+                PerformanceSeat.objects.filter(performance__in=performances).update(
+                    sold=Exists(
+                        Ticket.objects.filter(
+                            performance=OuterRef("performance"),
+                            row=OuterRef("row"),
+                            seat=OuterRef("seat"),
+                        )
+                    )
+                )
+            built += len(performances)
+        self.stdout.write(
+            self.style.SUCCESS(f"Built the seat inventory of {built} performances")
+        )
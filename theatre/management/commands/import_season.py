@@ -0,0 +1,207 @@
+import csv
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from theatre.cache import invalidate
+from theatre.models import Actor, Genre, Performance, Play, TheatreHall
+
+
+def read_records(path):
+    """Read a list of dicts from a .json or .csv file."""
+    path = Path(path)
+    if path.suffix == ".json":
+        with path.open(encoding="utf-8") as file:
+            return json.load(file)
+    if path.suffix == ".csv":
+        with path.open(encoding="utf-8", newline="") as file:
+            return list(csv.DictReader(file))
+    raise CommandError(f"{path}: only .csv and .json files are supported")
+
+
+def ids_by_name(pairs):
+    """Map each name to the ids of every row that has it."""
+    ids = defaultdict(list)
+    for name, pk in pairs:
+        ids[name].append(pk)
+    return ids
+
+
+def names(value):
+    """Names from a JSON list or a "|" separated CSV cell."""
+    if isinstance(value, list):
+        return [name.strip() for name in value if name.strip()]
+    return [name.strip() for name in (value or "").split("|") if name.strip()]
+
+
+class Command(BaseCommand):
+    """Django command to bulk import plays and performances of a season.
+
+    Plays need ``title`` and ``description`` and may list ``genres`` and
+    ``actors`` by name ("First Last"); in CSV files these are separated by
+    "|". Performances need ``play`` (title), ``theatre_hall`` (name) and
+    ``show_time``. Missing genres and actors are created, plays whose
+    title already exists are skipped.
+    """
+
+    help = "Bulk import plays and performances from CSV or JSON files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--plays", help="CSV or JSON file with plays")
+        parser.add_argument("--performances", help="CSV or JSON file with performances")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate and write everything, then roll back",
+        )
+
+    def handle(self, *args, **options):
+        if not options["plays"] and not options["performances"]:
+            raise CommandError("Pass --plays and/or --performances")
+        self.batch_size = options["batch_size"]
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            plays = (
+                self.import_plays(read_records(options["plays"]))
+                if options["plays"]
+                else 0
+            )
+            performances = (
+                self.import_performances(read_records(options["performances"]))
+                if options["performances"]
+                else 0
+            )
+            if options["dry_run"]:
+                transaction.set_rollback(True)
+            else:
+                invalidate(Genre, Actor, Play, Performance)
+        elapsed = time.perf_counter() - start
+
+        rows = plays + performances
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Validated' if options['dry_run'] else 'Imported'} "
+                f"{plays} plays and {performances} performances "
+                f"in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+        )
+
+    def import_plays(self, records):
+        first_lines, errors = {}, []
+        for line, record in enumerate(records, start=1):
+            first_line = first_lines.setdefault(record["title"], line)
+            if first_line != line:
+                errors.append(
+                    f"{line}: duplicate title {record['title']!r} "
+                    f"(first on line {first_line})"
+                )
+        if errors:
+            raise CommandError("Invalid plays:\n" + "\n".join(errors))
+
+        existing_titles = set(Play.objects.values_list("title", flat=True))
+        new_records = [
+            record for record in records if record["title"] not in existing_titles
+        ]
+        if len(new_records) < len(records):
+            self.stdout.write(
+                f"Skipped {len(records) - len(new_records)} plays "
+                f"whose title already exists"
+            )
+        records = new_records
+
+        genres = self.resolve(
+            Genre,
+            {genre.name: genre.id for genre in Genre.objects.all()},
+            {name for record in records for name in names(record.get("genres"))},
+            lambda name: Genre(name=name),
+        )
+        actors = self.resolve(
+            Actor,
+            {actor.full_name: actor.id for actor in Actor.objects.all()},
+            {name for record in records for name in names(record.get("actors"))},
+            lambda name: Actor(
+                first_name=name.split(" ", 1)[0],
+                last_name=name.split(" ", 1)[1] if " " in name else "",
+            ),
+        )
+
+        plays = Play.objects.bulk_create(
+            [
+                Play(title=record["title"], description=record["description"])
+                for record in records
+            ],
+            batch_size=self.batch_size,
+        )
+        Play.genres.through.objects.bulk_create(
+            [
+                Play.genres.through(play_id=play.id, genre_id=genres[name])
+                for play, record in zip(plays, records)
+                for name in names(record.get("genres"))
+            ],
+            batch_size=self.batch_size,
+        )
+        Play.actors.through.objects.bulk_create(
+            [
+                Play.actors.through(play_id=play.id, actor_id=actors[name])
+                for play, record in zip(plays, records)
+                for name in names(record.get("actors"))
+            ],
+            batch_size=self.batch_size,
+        )
+        return len(plays)
+
+    def resolve(self, model, lookup, wanted, build):
+        """Return a name -> id lookup, creating the missing names in bulk."""
+        missing = sorted(wanted - lookup.keys())
+        created = model.objects.bulk_create(
+            [build(name) for name in missing], batch_size=self.batch_size
+        )
+        lookup.update(zip(missing, (instance.id for instance in created)))
+        return lookup
+
+    def import_performances(self, records):
+        plays = ids_by_name(Play.objects.values_list("title", "id"))
+        theatre_halls = ids_by_name(TheatreHall.objects.values_list("name", "id"))
+
+        performances, errors = [], []
+        for line, record in enumerate(records, start=1):
+            play_ids = plays.get(record["play"], [])
+            theatre_hall_ids = theatre_halls.get(record["theatre_hall"], [])
+            show_time = parse_datetime(record["show_time"])
+            for label, value, ids in (
+                ("play", record["play"], play_ids),
+                ("theatre hall", record["theatre_hall"], theatre_hall_ids),
+            ):
+                if not ids:
+                    errors.append(f"{line}: unknown {label} {value!r}")
+                elif len(ids) > 1:
+                    errors.append(
+                        f"{line}: ambiguous {label} {value!r} "
+                        f"matches {len(ids)} rows"
+                    )
+            if show_time is None:
+                errors.append(f"{line}: invalid show_time {record['show_time']!r}")
+            if errors:
+                continue
+            if timezone.is_naive(show_time):
+                show_time = timezone.make_aware(show_time)
+            performances.append(
+                Performance(
+                    play_id=play_ids[0],
+                    theatre_hall_id=theatre_hall_ids[0],
+                    show_time=show_time,
+                )
+            )
+        if errors:
+            raise CommandError("Invalid performances:\n" + "\n".join(errors))
+
+        Performance.objects.bulk_create(performances, batch_size=self.batch_size)
+        return len(performances)
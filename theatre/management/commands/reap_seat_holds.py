@@ -0,0 +1,30 @@
+import time
+
+from django.core.management import BaseCommand
+
+from theatre.models import SeatHold
+
+
+class Command(BaseCommand):
+    """Django command to delete expired seat holds.
+
+    Run it from cron, or keep it running with ``--interval``.
+    """
+
+    help = "Delete expired seat holds"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            help="Repeat every INTERVAL seconds instead of running once",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            # A single DELETE using seat_hold_expires_at_idx.
+            deleted, _ = SeatHold.objects.expired().delete()
+            self.stdout.write(f"Deleted {deleted} expired seat holds")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
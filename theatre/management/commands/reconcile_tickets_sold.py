@@ -0,0 +1,59 @@
+from django.core.management import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from theatre.cache import invalidate
+from theatre.models import Performance, Ticket
+from theatre.seat_map import invalidate_seat_maps
+
+
+class Command(BaseCommand):
+    """Django command to compare ``Performance.tickets_sold`` with the tickets.
+
+    Reports every performance whose counter drifted; ``--fix`` resets them
+    to the real count.
+    """
+
+    help = "Report, and with --fix repair, drift of Performance.tickets_sold"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Reset drifted counters")
+
+    def handle(self, *args, **options):
+        tickets_count = Coalesce(
+            Subquery(
+                Ticket.objects.filter(performance=OuterRef("pk"))
+                .values("performance")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+        drifted = (
+            Performance.objects.annotate(tickets_count=tickets_count)
+            .exclude(tickets_sold=F("tickets_count"))
+            .order_by("id")
+            .values_list("id", "tickets_sold", "tickets_count")
+        )
+        ids = []
+        for performance_id, tickets_sold, count in drifted:
+            ids.append(performance_id)
+            self.stdout.write(
+                f"Performance {performance_id}: tickets_sold={tickets_sold}, "
+                f"tickets={count}"
+            )
+
+        if not ids:
+            self.stdout.write(self.style.SUCCESS("No drift found"))
+        elif options["fix"]:
+            # Recounted in the UPDATE itself, so tickets sold meanwhile
+            # are not lost.
+            Performance.objects.filter(id__in=ids).update(tickets_sold=tickets_count)
+            # update() sends no signals.
+            invalidate(Performance)
+            invalidate_seat_maps(ids)
+            self.stdout.write(self.style.SUCCESS(f"Fixed {len(ids)} performances"))
+        else:
+            self.stdout.write(
+                self.style.WARNING(f"{len(ids)} performances drifted, run with --fix")
+            )
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.4 on 2026-10-18 17:06
+
+from django.core.management import CommandError
+from django.db import migrations, models
+
+MAX_REPORTED_SEATS = 50
+
+
+def check_double_bookings(apps, schema_editor):
+    """Fail with the double-booked seats instead of a bare IntegrityError.
+
+    Tickets are not deleted here: which of them to keep, refund or move is
+    a business decision.
+    """
+    Ticket = apps.get_model("theatre", "Ticket")
+    duplicates = list(
+        Ticket.objects.values("performance_id", "row", "seat")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+        .order_by("performance_id", "row", "seat")
+    )
+    if not duplicates:
+        return
+    lines = [
+        f"performance {seat['performance_id']}, row {seat['row']}, "
+        f"seat {seat['seat']}: ticket ids "
+        + ", ".join(
+            str(ticket_id)
+            for ticket_id in Ticket.objects.filter(
+                performance_id=seat["performance_id"],
+                row=seat["row"],
+                seat=seat["seat"],
+            )
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        for seat in duplicates[:MAX_REPORTED_SEATS]
+    ]
+    if len(duplicates) > MAX_REPORTED_SEATS:
+        lines.append(f"... and {len(duplicates) - MAX_REPORTED_SEATS} more seats")
+    raise CommandError(
+        f"{len(duplicates)} seats are sold more than once. Delete or move the "
+        "extra tickets, then run migrate again:\n" + "\n".join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0003_alter_ticket_performance_alter_ticket_reservation"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_double_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="ticket",
+            constraint=models.UniqueConstraint(
+                fields=("performance", "row", "seat"),
+                name="unique_ticket_seat_per_performance",
+            ),
+        ),
+    ]
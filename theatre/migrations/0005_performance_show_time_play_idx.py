@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-18 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0004_ticket_unique_seat"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["show_time", "play"], name="performance_show_time_play_idx"
+            ),
+        ),
+    ]
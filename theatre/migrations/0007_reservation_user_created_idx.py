@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-18 17:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0006_play_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["user", "created_at"], name="reservation_user_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.4 on 2026-10-18 17:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0008_seat_hold"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PerformanceSeat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("row", models.PositiveIntegerField()),
+                ("seat", models.PositiveIntegerField()),
+                ("sold", models.BooleanField(default=False)),
+                (
+                    "performance",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inventory",
+                        to="theatre.performance",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("sold", False)),
+                        fields=["performance"],
+                        name="performance_seat_free_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="performanceseat",
+            constraint=models.UniqueConstraint(
+                fields=("performance", "row", "seat"),
+                name="unique_inventory_seat_per_performance",
+            ),
+        ),
+    ]
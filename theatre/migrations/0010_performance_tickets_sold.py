@@ -0,0 +1,35 @@
+# Generated by Django 4.2.4 on 2026-10-18 17:40
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_tickets_sold(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+    Ticket = apps.get_model("theatre", "Ticket")
+    Performance.objects.update(
+        tickets_sold=Coalesce(
+            models.Subquery(
+                Ticket.objects.filter(performance=models.OuterRef("pk"))
+                .values("performance")
+                .annotate(count=models.Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("theatre", "0009_performance_seat"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="performance",
+            name="tickets_sold",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_tickets_sold, migrations.RunPython.noop),
+    ]
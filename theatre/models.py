@@ -1,4 +1,9 @@
-from django.db import models
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, models
+from django.db.models.functions import Upper
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
 from user.models import User
@@ -23,12 +28,49 @@ class Genre(models.Model):
         return self.name
 
 
+PLAY_SEARCH_VECTOR = SearchVector("title", "description", config="english")
+
+
+class PlayQuerySet(models.QuerySet):
+    def search(self, text):
+        """Full-text search ranked by relevance on PostgreSQL.
+
+        Other databases fall back to a case-insensitive substring match.
+        """
+        if connections[self.db].vendor != "postgresql":
+            return self.filter(
+                models.Q(title__icontains=text)
+                | models.Q(description__icontains=text)
+            )
+        query = SearchQuery(text, config="english", search_type="websearch")
+        return (
+            self.annotate(
+                search=PLAY_SEARCH_VECTOR,
+                rank=SearchRank(PLAY_SEARCH_VECTOR, query),
+            )
+            .filter(search=query)
+            .order_by("-rank", "id")
+        )
+
+
 class Play(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     genres = models.ManyToManyField(Genre, related_name="plays")
     actors = models.ManyToManyField(Actor, related_name="plays")
 
+    objects = PlayQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves title__icontains, i.e. UPPER(title) LIKE UPPER('%x%').
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="play_title_trgm_idx",
+            ),
+            GinIndex(PLAY_SEARCH_VECTOR, name="play_search_vector_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -46,16 +88,85 @@ class TheatreHall(models.Model):
         return self.name
 
 
+class PerformanceQuerySet(models.QuerySet):
+    def with_tickets_available(self):
+        return self.annotate(
+            tickets_available=(
+                models.F("theatre_hall__rows") * models.F("theatre_hall__seats_in_row")
+                - models.F("tickets_sold")
+            )
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        performances = super().bulk_create(objs, *args, **kwargs)
+        # post_save is not sent, so the inventory of single saves
+        # (theatre.signals) is generated here for bulk inserts.
+        if settings.SEAT_INVENTORY:
+            PerformanceSeat.generate(performances)
+        return performances
+
+
 class Performance(models.Model):
     play = models.ForeignKey(Play, on_delete=models.CASCADE)
     theatre_hall = models.ForeignKey(TheatreHall, on_delete=models.CASCADE)
     show_time = models.DateTimeField()
+    # Maintained by the ticket write paths, checked by
+    # manage.py reconcile_tickets_sold.
+    tickets_sold = models.PositiveIntegerField(default=0)
+
+    objects = PerformanceQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["show_time", "play"], name="performance_show_time_play_idx"
+            )
+        ]
+
+    def save(self, *args, **kwargs):
+        # Updates never write tickets_sold: the value loaded with the
+        # instance would overwrite increments made by count_tickets since.
+        if not self._state.adding:
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred
+                ]
+            kwargs["update_fields"] = [
+                field for field in update_fields if field != "tickets_sold"
+            ]
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def count_tickets(counts):
+        """Add ``counts`` (performance id -> delta) to ``tickets_sold``.
+
+        One UPDATE per performance, in id order so that concurrent
+        writers lock the rows in the same order. Reservations call it after
+        commit, so the counter may briefly lag the tickets and a failure
+        in between leaves drift for ``reconcile_tickets_sold``.
+        """
+        for performance_id, delta in sorted(counts.items()):
+            if delta:
+                Performance.objects.filter(id=performance_id).update(
+                    tickets_sold=models.F("tickets_sold") + delta
+                )
 
 
 class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "created_at"], name="reservation_user_created_idx"
+            )
+        ]
+
 
 class Ticket(models.Model):
     row = models.PositiveIntegerField()
@@ -67,23 +178,37 @@ class Ticket(models.Model):
         Reservation, on_delete=models.CASCADE, related_name="tickets"
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["performance", "row", "seat"],
+                name="unique_ticket_seat_per_performance",
+            )
+        ]
+
     @staticmethod
-    def validate_ticket(row, seat, theatre_hall, error_to_raise):
+    def seat_errors(row, seat, theatre_hall):
+        """Return the out-of-range errors of the seat, keyed by field."""
+        errors = {}
         for ticket_attr_value, ticket_attr_name, theatre_hall_attr_name in [
             (row, "row", "rows"),
             (seat, "seat", "seats_in_row")
         ]:
             count_attr = getattr(theatre_hall, theatre_hall_attr_name)
             if not (1 <= ticket_attr_value <= count_attr):
-                raise error_to_raise(
-                    {
-                        ticket_attr_name: f"{ticket_attr_name} "
-                                          f"number must be in available range:"
-                                          f"(1, {theatre_hall_attr_name})"
-                                          f"(1, {count_attr}"
-
-                    }
+                errors[ticket_attr_name] = (
+                    f"{ticket_attr_name} "
+                    f"number must be in available range:"
+                    f"(1, {theatre_hall_attr_name})"
+                    f"(1, {count_attr}"
                 )
+        return errors
+
+    @staticmethod
+    def validate_ticket(row, seat, theatre_hall, error_to_raise):
+        errors = Ticket.seat_errors(row, seat, theatre_hall)
+        if errors:
+            raise error_to_raise(errors)
 
     def clean(self):
         Ticket.validate_ticket(
@@ -92,3 +217,133 @@ class Ticket(models.Model):
             self.performance.theatre_hall,
             ValidationError
         )
+
+    @staticmethod
+    def taken_seats(tickets_data):
+        """Return (performance_id, row, seat) of the requested seats already sold."""
+        return set(
+            Ticket.objects.filter(seats_filter(tickets_data)).values_list(
+                "performance_id", "row", "seat"
+            )
+        )
+
+
+def seats_filter(tickets_data):
+    """``Q`` matching any of the (performance, row, seat) in ``tickets_data``."""
+    seats = models.Q()
+    for ticket_data in tickets_data:
+        seats |= models.Q(
+            performance=ticket_data["performance"],
+            row=ticket_data["row"],
+            seat=ticket_data["seat"],
+        )
+    return seats
+
+
+class PerformanceSeat(models.Model):
+    """One row per seat of a performance, kept when ``SEAT_INVENTORY`` is on.
+
+    Generated with the performance and marked sold by the reservation write
+    path, so free seats and sold-out performances are found through
+    ``performance_seat_free_idx`` instead of counting tickets.
+    """
+
+    row = models.PositiveIntegerField()
+    seat = models.PositiveIntegerField()
+    performance = models.ForeignKey(
+        Performance, on_delete=models.CASCADE, related_name="inventory"
+    )
+    sold = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["performance", "row", "seat"],
+                name="unique_inventory_seat_per_performance",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["performance"],
+                condition=models.Q(sold=False),
+                name="performance_seat_free_idx",
+            )
+        ]
+
+    @staticmethod
+    def generate(performances, batch_size=1000):
+        """Insert the free seats of each performance's hall."""
+        theatre_halls = TheatreHall.objects.in_bulk(
+            {performance.theatre_hall_id for performance in performances}
+        )
+        PerformanceSeat.objects.bulk_create(
+            (
+                PerformanceSeat(performance_id=performance.id, row=row, seat=seat)
+                for performance in performances
+                for row in range(1, theatre_halls[performance.theatre_hall_id].rows + 1)
+                for seat in range(
+                    1, theatre_halls[performance.theatre_hall_id].seats_in_row + 1
+                )
+            ),
+            batch_size=batch_size,
+        )
+
+    @staticmethod
+    def mark(tickets, sold):
+        """Mark the seats of ``tickets`` sold or free in one UPDATE."""
+        PerformanceSeat.objects.filter(
+            seats_filter(
+                {
+                    "performance": ticket.performance_id,
+                    "row": ticket.row,
+                    "seat": ticket.seat,
+                }
+                for ticket in tickets
+            )
+        ).update(sold=sold)
+
+
+class SeatHoldQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class SeatHold(models.Model):
+    """A seat kept aside for a user until ``expires_at``.
+
+    The unique constraint makes a hold a single INSERT, a release a single
+    DELETE. Expired holds keep their row until ``reap_seat_holds`` (or a
+    conflicting hold) deletes them.
+    """
+
+    row = models.PositiveIntegerField()
+    seat = models.PositiveIntegerField()
+    performance = models.ForeignKey(
+        Performance, on_delete=models.CASCADE, related_name="holds"
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="holds")
+    expires_at = models.DateTimeField()
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["performance", "row", "seat"],
+                name="unique_hold_seat_per_performance",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"], name="seat_hold_expires_at_idx")
+        ]
+
+    @staticmethod
+    def held_seats(tickets_data, exclude_user_id=None):
+        """Return (performance_id, row, seat) of the requested seats held now."""
+        holds = SeatHold.objects.active().filter(seats_filter(tickets_data))
+        if exclude_user_id is not None:
+            holds = holds.exclude(user_id=exclude_user_id)
+        return set(holds.values_list("performance_id", "row", "seat"))
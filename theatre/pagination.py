@@ -0,0 +1,147 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from theatre.cache import get_versions
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 20
+
+
+class CachedCountPaginator(DjangoPaginator):
+    def __init__(self, object_list, per_page, pagination, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.pagination = pagination
+
+    @cached_property
+    def count(self):
+        return self.pagination.get_count(self.object_list)
+
+
+class CachedCountPagination(StandardResultsSetPagination):
+    """Page number pagination that avoids running COUNT(*) on every page.
+
+    Unfiltered PostgreSQL queries over large tables use the planner's row
+    estimate from ``pg_class.reltuples``; every other count is cached per
+    filter set until the model, or any of the view's ``cache_dependencies``
+    that filters may read, is written to or the short TTL expires.
+    ``count_is_approximate`` in the response tells which one was used.
+    """
+
+    count_excluded_params = ("page", "page_size", "cursor", "pagination", "format")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.view = view
+        self.count_is_approximate = False
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        return CachedCountPaginator(object_list, per_page, pagination=self)
+
+    def get_count(self, queryset):
+        if not queryset.query.where:
+            estimate = self.estimate_count(queryset)
+            if estimate is not None:
+                self.count_is_approximate = True
+                return estimate
+
+        key = self.get_count_cache_key(queryset)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def get_count_cache_key(self, queryset):
+        params = sorted(
+            (key, value)
+            for key, value in self.request.query_params.items()
+            if key not in self.count_excluded_params
+        )
+        filters = hashlib.md5(urlencode(params).encode()).hexdigest()
+        dependencies = dict.fromkeys(
+            (queryset.model, *getattr(self.view, "cache_dependencies", ()))
+        )
+        versions = "-".join(str(version) for version in get_versions(*dependencies))
+        return f"theatre:count:{queryset.model._meta.label_lower}:{versions}:{filters}"
+
+    @staticmethod
+    def estimate_count(queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+            return None
+        return int(row[0])
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.page.paginator.count,
+                "count_is_approximate": self.count_is_approximate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_approximate"] = {
+            "type": "boolean",
+            "example": False,
+        }
+        return response_schema
+
+
+class ShowTimeCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 20
+    ordering = ("show_time", "id")
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 20
+    ordering = ("created_at", "id")
+
+
+class CursorPaginationMixin:
+    """Switch a viewset to ``cursor_pagination_class`` on request.
+
+    Clients opt in with ``?pagination=cursor``; the ``next``/``previous``
+    links then carry a ``cursor`` parameter which keeps the mode. A viewset
+    can also opt in for every request by using a cursor pagination class
+    as its ``pagination_class``.
+    """
+
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if self.cursor_pagination_class is not None and (
+                params.get("pagination") == "cursor" or "cursor" in params
+            ):
+                self._paginator = self.cursor_pagination_class()
+        return super().paginator
@@ -7,11 +7,23 @@ class IsAdminOrReadOnly(BasePermission):
     """
 
     def has_permission(self, request, view):
-        return bool(
-            (
-                request.method in SAFE_METHODS
-                and request.user
-                or request.user.is_authenticated
-            )
-            or (request.user and request.user.is_staff)
-        )
+        # Checking the method first keeps reads from touching request.user,
+        # which is what triggers authentication.
+        return request.method in SAFE_METHODS or request.user.is_authenticated
+
+
+class AnonymousReadMixin:
+    """Skip authentication of read requests that carry no credentials.
+
+    DRF authenticates every request up front; here a GET without an
+    ``Authorization`` header is only authenticated if something actually
+    reads ``request.user``.
+    """
+
+    def perform_authentication(self, request):
+        if (
+            request.method in SAFE_METHODS
+            and "HTTP_AUTHORIZATION" not in request.META
+        ):
+            return
+        super().perform_authentication(request)
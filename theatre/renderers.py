@@ -0,0 +1,134 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` backed by orjson.
+
+    Values orjson can not encode natively (``datetime`` included, so the
+    ``Z`` suffix matches) go through DRF's encoder, so the bytes are the
+    same as ``JSONRenderer``'s except for floats: orjson writes exponents
+    differently (``1e-5`` for ``1e-05``) and renders NaN and Infinity as
+    ``null`` instead of raising. Indented output, non-default
+    ``COMPACT_JSON`` or ``UNICODE_JSON`` settings, and everything when
+    orjson is not installed use the stdlib renderer.
+    """
+
+    @property
+    def use_orjson(self):
+        return orjson is not None and self.compact and not self.ensure_ascii
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not self.use_orjson or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return self.dumps(data)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+    def dumps(self, data):
+        """Unindented JSON bytes for ``data``, with or without orjson."""
+        if self.use_orjson:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        else:
+            ret = json.dumps(
+                data,
+                cls=self.encoder_class,
+                ensure_ascii=self.ensure_ascii,
+                allow_nan=not self.strict,
+                separators=SHORT_SEPARATORS if self.compact else LONG_SEPARATORS,
+            ).encode()
+        # Same escaping as JSONRenderer: U+2028 and U+2029 are valid JSON
+        # but break JavaScript string literals.
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b"\\u2028").replace(
+                PARAGRAPH_SEPARATOR, b"\\u2029"
+            )
+        return ret
+
+
+class StreamingJSONRenderer(FastJSONRenderer):
+    """Renders a JSON array incrementally from any iterable.
+
+    ``stream()`` encodes one item at a time, so the whole document never
+    exists in memory; pass it to ``StreamingHttpResponse``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or isinstance(data, dict):
+            return super().render(data, accepted_media_type, renderer_context)
+        return b"".join(self.stream(data))
+
+    def stream(self, items):
+        separator = b"["
+        for item in items:
+            yield separator + self.dumps(item)
+            separator = b"," if self.compact else b", "
+        yield b"[]" if separator == b"[" else b"]"
+
+
+class NDJSONRenderer(StreamingJSONRenderer):
+    """Newline delimited JSON: one compact JSON document per line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = [data]
+        return super().render(data, accepted_media_type, renderer_context)
+
+    def stream(self, items):
+        for item in items:
+            yield self.dumps(item) + b"\n"
+
+
+class _Line:
+    """File-like object whose write() hands back the formatted line."""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(BaseRenderer):
+    """CSV with a header row taken from the keys of the first item.
+
+    Like ``StreamingJSONRenderer``, ``stream()`` yields one line per item.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if isinstance(data, dict):
+            data = [data]
+        return b"".join(self.stream(data))
+
+    def stream(self, items):
+        writer = csv.writer(_Line())
+        header = None
+        for item in items:
+            if header is None:
+                header = list(item)
+                yield writer.writerow(header).encode()
+            yield writer.writerow(item.values()).encode()
@@ -0,0 +1,102 @@
+"""Per-performance seat occupancy maps.
+
+Occupancy is stored as a bitmap in row-major order: bit ``i`` (most
+significant bit first) stands for row ``i // seats_in_row + 1``, seat
+``i % seats_in_row + 1`` and is set when the seat is sold.
+
+Maps are cached under a per-performance version stamp, like the model
+versions in ``theatre.cache``: invalidating bumps the stamp, so a map built
+from data read before a reservation committed is stored under the old
+stamp and never served afterwards.
+"""
+import base64
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from theatre.models import PerformanceSeat, Ticket
+
+ENCODINGS = ("bitmap", "rle")
+
+
+def version_key(performance_id):
+    return f"theatre:seat_map_version:{performance_id}"
+
+
+def cache_key(performance_id):
+    """Key of the map under the performance's current version."""
+    key = version_key(performance_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return f"theatre:seat_map:{performance_id}:{version}"
+
+
+def build_bitmap(performance):
+    theatre_hall = performance.theatre_hall
+    bitmap = bytearray((theatre_hall.capacity + 7) // 8)
+    if settings.SEAT_INVENTORY:
+        sold = PerformanceSeat.objects.filter(performance=performance, sold=True)
+    else:
+        sold = Ticket.objects.filter(performance=performance)
+    sold = sold.values_list("row", "seat")
+    for row, seat in sold:
+        # Tickets sold before the hall was made smaller have no bit.
+        if not (
+            1 <= row <= theatre_hall.rows and 1 <= seat <= theatre_hall.seats_in_row
+        ):
+            continue
+        index = (row - 1) * theatre_hall.seats_in_row + seat - 1
+        bitmap[index >> 3] |= 0x80 >> (index & 7)
+    return bytes(bitmap)
+
+
+def run_lengths(bitmap, size):
+    """Alternating run lengths of free and sold seats, starting with free."""
+    runs = []
+    current, length = False, 0
+    for index in range(size):
+        taken = bool(bitmap[index >> 3] & (0x80 >> (index & 7)))
+        if taken != current:
+            runs.append(length)
+            current, length = taken, 0
+        length += 1
+    runs.append(length)
+    return runs
+
+
+def get_seat_map(performance_id, load_performance, encoding="bitmap"):
+    """Return the cached seat map, building it with ``load_performance`` on a miss."""
+    key = cache_key(performance_id)
+    seat_map = cache.get(key)
+    if seat_map is None:
+        performance = load_performance()
+        theatre_hall = performance.theatre_hall
+        bitmap = build_bitmap(performance)
+        seat_map = {
+            "performance": performance.id,
+            "rows": theatre_hall.rows,
+            "seats_in_row": theatre_hall.seats_in_row,
+            "tickets_sold": sum(bin(byte).count("1") for byte in bitmap),
+            "bitmap": bitmap,
+        }
+        cache.set(key, seat_map, settings.SEAT_MAP_CACHE_TIMEOUT)
+
+    bitmap = seat_map["bitmap"]
+    data = {key: value for key, value in seat_map.items() if key != "bitmap"}
+    data["encoding"] = encoding
+    if encoding == "rle":
+        data["seats"] = run_lengths(bitmap, seat_map["rows"] * seat_map["seats_in_row"])
+    else:
+        data["seats"] = base64.b64encode(bitmap).decode()
+    return data
+
+
+def invalidate_seat_maps(performance_ids):
+    now = time.time_ns()
+    cache.set_many(
+        {version_key(performance_id): now for performance_id in performance_ids},
+        None,
+    )
@@ -1,24 +1,46 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Actor, Genre, Play, Reservation, TheatreHall, Performance, Ticket
+from .models import (
+    Actor,
+    Genre,
+    Play,
+    Reservation,
+    SeatHold,
+    TheatreHall,
+    Performance,
+    PerformanceSeat,
+    Ticket,
+)
+from .bulk import BulkListSerializer
+from .cache import invalidate
+from .locking import lock_seats
+from .seat_map import invalidate_seat_maps
 
 
 class ActorSerializer(serializers.ModelSerializer):
     class Meta:
         model = Actor
         fields = ("id", "first_name", "last_name", "full_name")
+        list_serializer_class = BulkListSerializer
 
 
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = "__all__"
+        list_serializer_class = BulkListSerializer
 
 
 class TheatreHallSerializer(serializers.ModelSerializer):
     class Meta:
         model = TheatreHall
         fields = "__all__"
+        list_serializer_class = BulkListSerializer
 
 
 class PlaySerializer(serializers.ModelSerializer):
@@ -36,11 +58,14 @@ class PerformanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Performance
         fields = "__all__"
+        read_only_fields = ("tickets_sold",)
+        list_serializer_class = BulkListSerializer
 
 
 class PerformanceListSerializer(PerformanceSerializer):
     play = PlaySerializer()
     theatre_hall = TheatreHallSerializer()
+    tickets_available = serializers.IntegerField(read_only=True)
 
 
 class PerformanceForTicketSerializer(PerformanceSerializer):
@@ -49,7 +74,52 @@ class PerformanceForTicketSerializer(PerformanceSerializer):
         fields = "__all__"
 
 
+def validate_seats(tickets_data):
+    """Check all seats in one pass and return the errors of each of them.
+
+    The performances of every ticket are loaded with their halls in a
+    single query and put into ``tickets_data``. The result is aligned with
+    ``tickets_data``, ``{}`` for a valid ticket, so every problem is
+    reported at once.
+    """
+    performances = Performance.objects.select_related("theatre_hall").in_bulk(
+        {ticket_data["performance_id"] for ticket_data in tickets_data}
+    )
+    seats, errors = set(), []
+    for ticket_data in tickets_data:
+        performance_id = ticket_data.pop("performance_id")
+        performance = performances.get(performance_id)
+        if performance is None:
+            errors.append(
+                {
+                    "performance": [
+                        f'Invalid pk "{performance_id}" - object does not exist.'
+                    ]
+                }
+            )
+            continue
+        ticket_data["performance"] = performance
+        ticket_errors = {
+            field: [message]
+            for field, message in Ticket.seat_errors(
+                ticket_data["row"], ticket_data["seat"], performance.theatre_hall
+            ).items()
+        }
+        seat = (performance.id, ticket_data["row"], ticket_data["seat"])
+        if seat in seats:
+            ticket_errors["non_field_errors"] = [
+                "The same seat can not be reserved twice."
+            ]
+        seats.add(seat)
+        errors.append(ticket_errors)
+    return errors
+
+
 class TicketSerializer(serializers.ModelSerializer):
+    # Resolved for all tickets at once by validate_seats instead of one
+    # query per ticket by a PrimaryKeyRelatedField.
+    performance = serializers.IntegerField(source="performance_id")
+
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "performance")
@@ -71,12 +141,35 @@ class ReservationSerializer(serializers.ModelSerializer):
         model = Reservation
         fields = ("id", "created_at", "tickets")
 
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        errors = validate_seats(data["tickets"])
+        if any(errors):
+            raise serializers.ValidationError({"tickets": errors})
+        return data
+
     def create(self, validated_data):
         with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
+            tickets = [
+                Ticket(**ticket_data) for ticket_data in validated_data.pop("tickets")
+            ]
+            lock_seats(tickets)
             reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(reservation=reservation, **ticket_data)
+            for ticket in tickets:
+                ticket.reservation = reservation
+            Ticket.objects.bulk_create(tickets)
+            # Counted after commit: an UPDATE here would lock the performance
+            # row until then and serialize every reservation for it.
+            counts = Counter(ticket.performance_id for ticket in tickets)
+            transaction.on_commit(lambda: Performance.count_tickets(counts))
+            if settings.SEAT_INVENTORY:
+                PerformanceSeat.mark(tickets, sold=True)
+            # bulk_create returns the ids, so the response can reuse these
+            # instances instead of reading the tickets back.
+            reservation._prefetched_objects_cache = {"tickets": tickets}
+            invalidate(Ticket)
+            performance_ids = {ticket.performance_id for ticket in tickets}
+            transaction.on_commit(lambda: invalidate_seat_maps(performance_ids))
             return reservation
 
 
@@ -86,3 +179,39 @@ class ReservationListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reservation
         fields = ("id", "created_at", "tickets")
+
+
+class SeatHoldListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        # Raised from here, the errors stay a list aligned with the items
+        # instead of being wrapped into non_field_errors by validate().
+        attrs = super().to_internal_value(data)
+        errors = validate_seats(attrs)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        """Hold all seats with a single INSERT."""
+        expires_at = timezone.now() + timedelta(minutes=settings.SEAT_HOLD_MINUTES)
+        return SeatHold.objects.bulk_create(
+            [SeatHold(expires_at=expires_at, **attrs) for attrs in validated_data]
+        )
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    performance = serializers.IntegerField(source="performance_id")
+
+    class Meta:
+        model = SeatHold
+        fields = ("id", "row", "seat", "performance", "expires_at")
+        read_only_fields = ("expires_at",)
+        list_serializer_class = SeatHoldListSerializer
+
+
+class SeatHoldConfirmSerializer(serializers.Serializer):
+    holds = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text="Holds to confirm, all active holds of the user by default",
+    )
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from theatre.cache import invalidate
+from theatre.models import (
+    Actor,
+    Genre,
+    Play,
+    Performance,
+    PerformanceSeat,
+    TheatreHall,
+    Reservation,
+    Ticket,
+)
+from theatre.seat_map import invalidate_seat_maps
+
+VERSIONED_MODELS = (Actor, Genre, Play, Performance, TheatreHall, Reservation, Ticket)
+
+
+def model_changed(sender, **kwargs):
+    invalidate(sender)
+
+
+# Connected per model: a receiver for every sender would also stop
+# Django from fast-deleting unrelated models such as SeatHold.
+for model in VERSIONED_MODELS:
+    post_save.connect(model_changed, sender=model)
+    post_delete.connect(model_changed, sender=model)
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def play_relations_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate(Play)
+
+
+@receiver(post_save, sender=Performance)
+def performance_saved(sender, instance, created, **kwargs):
+    if created and settings.SEAT_INVENTORY:
+        PerformanceSeat.generate([instance])
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_saved(sender, instance, created, **kwargs):
+    transaction.on_commit(lambda: invalidate_seat_maps([instance.performance_id]))
+    # Reservations insert tickets in bulk and count them themselves.
+    if not created:
+        return
+    Performance.count_tickets({instance.performance_id: 1})
+    if settings.SEAT_INVENTORY:
+        PerformanceSeat.mark([instance], sold=True)
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_deleted(sender, instance, **kwargs):
+    Performance.count_tickets({instance.performance_id: -1})
+    if settings.SEAT_INVENTORY:
+        PerformanceSeat.mark([instance], sold=False)
+    transaction.on_commit(lambda: invalidate_seat_maps([instance.performance_id]))
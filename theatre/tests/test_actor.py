@@ -8,6 +8,7 @@ from rest_framework import status
 from theatre.models import Actor
 
 ACTOR_URL = reverse("theatre:actor-list")
+ACTOR_BULK_URL = reverse("theatre:actor-bulk-update")
 
 def detail_url(actor_id):
     return reverse("theatre:actor-detail", args=[actor_id])
@@ -77,6 +78,85 @@ class ActorApiViewSetTests(TestCase):
         self.assertIn("next", response.data)
         self.assertIn("previous", response.data)
 
+    def test_bulk_create_actors(self):
+        payload = [
+            {"first_name": "Jane", "last_name": "Smith"},
+            {"first_name": "Max", "last_name": "Payne"},
+        ]
+        response = self.client.post(ACTOR_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [actor["full_name"] for actor in response.data], ["Jane Smith", "Max Payne"]
+        )
+        self.assertEqual(Actor.objects.count(), 3)
+
+    def test_bulk_create_actors_reports_item_errors(self):
+        payload = [
+            {"first_name": "Jane", "last_name": "Smith"},
+            {"first_name": "Max"},
+        ]
+        response = self.client.post(ACTOR_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("last_name", response.data[1])
+        self.assertEqual(Actor.objects.count(), 1)
+
+    def test_bulk_update_actors(self):
+        other = Actor.objects.create(first_name="Jane", last_name="Smith")
+        payload = [
+            {"id": self.actor.id, "first_name": "Johnny"},
+            {"id": other.id, "last_name": "Doe"},
+        ]
+        response = self.client.patch(ACTOR_BULK_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [actor["full_name"] for actor in response.data], ["Johnny Doe", "Jane Doe"]
+        )
+        self.actor.refresh_from_db()
+        self.assertEqual(self.actor.first_name, "Johnny")
+
+    def test_bulk_update_actors_reports_item_errors(self):
+        payload = [
+            {"id": self.actor.id, "first_name": "Johnny"},
+            {"id": self.actor.id + 100, "first_name": "Ghost"},
+            {"first_name": "No id"},
+        ]
+        response = self.client.patch(ACTOR_BULK_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("id", response.data[1])
+        self.assertIn("id", response.data[2])
+        self.actor.refresh_from_db()
+        self.assertEqual(self.actor.first_name, "John")
+
+    def test_bulk_payload_limit(self):
+        with self.settings(BULK_MAX_ITEMS=1):
+            response = self.client.post(
+                ACTOR_URL,
+                [self.actor_data, self.actor_data],
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Actor.objects.count(), 1)
+
+    def test_bulk_requires_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(password="userpass", email="user@example.com")
+        )
+        response = self.client.post(ACTOR_URL, [self.actor_data] * 3, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.patch(
+            ACTOR_BULK_URL, [{"id": self.actor.id, "first_name": "Johnny"}], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Actor.objects.count(), 1)
+
+        self.client.logout()
+        response = self.client.patch(
+            ACTOR_BULK_URL, [{"id": self.actor.id, "first_name": "Johnny"}], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_permission(self):
         self.client.logout()  # Log out the admin user
         response = self.client.post(ACTOR_URL, self.actor_data)
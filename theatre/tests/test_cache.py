@@ -0,0 +1,163 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre import cache as cache_module
+from theatre.models import Actor, Genre, Play, Performance, TheatreHall
+
+ACTOR_URL = reverse("theatre:actor-list")
+PLAY_URL = reverse("theatre:play-list")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+CACHE_STATS_URL = reverse("theatre:cache-stats")
+
+
+class CachedResponseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.genre = Genre.objects.create(name="Drama")
+        self.actor = Actor.objects.create(first_name="John", last_name="Doe")
+        self.play = Play.objects.create(title="Hamlet", description="A classic tragedy")
+        self.play.genres.set([self.genre])
+
+    def test_response_is_cached(self):
+        response = self.client.get(PLAY_URL)
+        self.assertEqual(response["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            response = self.client.get(PLAY_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.data["results"][0]["title"], "Hamlet")
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get(PLAY_URL)
+        response = self.client.get(PLAY_URL, {"title": "Macbeth"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"], [])
+
+    def test_invalidated_on_save(self):
+        self.client.get(ACTOR_URL)
+        self.actor.first_name = "Jane"
+        self.actor.save()
+        response = self.client.get(ACTOR_URL)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["first_name"], "Jane")
+
+    def test_invalidated_by_nested_models(self):
+        self.client.get(PLAY_URL)
+        self.genre.name = "Tragedy"
+        self.genre.save()
+        response = self.client.get(PLAY_URL)
+        self.assertEqual(response.data["results"][0]["genres"][0]["name"], "Tragedy")
+
+    def test_invalidated_on_m2m_change(self):
+        self.client.get(PLAY_URL)
+        self.play.actors.add(self.actor)
+        response = self.client.get(PLAY_URL)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["actors"][0]["id"], self.actor.id)
+
+    def test_cache_stats(self):
+        self.client.get(PLAY_URL)
+        self.client.get(PLAY_URL)
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                password="adminpass",
+                email="admin@example.com"
+            )
+        )
+        response = self.client.get(CACHE_STATS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+    def test_cache_stats_admin_only(self):
+        response = self.client.get(CACHE_STATS_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            password="userpass",
+            email="user@example.com"
+        )
+        self.play = Play.objects.create(title="Hamlet", description="A classic tragedy")
+        self.theatre_hall = TheatreHall.objects.create(name="Main Hall", rows=10, seats_in_row=20)
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time="2023-09-10T14:30:00Z",
+        )
+        # Start every version now, not at the first (time-shifted) request.
+        cache_module.get_versions(Play, Genre, Actor)
+
+    def at(self, seconds):
+        """Pretend the clock is ``seconds`` after the setUp writes."""
+        now = time.time_ns() + int(seconds * 1_000_000_000)
+        return mock.patch.object(cache_module.time, "time_ns", return_value=now)
+
+    def test_etag_and_last_modified(self):
+        with self.at(2):
+            response = self.client.get(PLAY_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", response)
+
+    def test_no_last_modified_in_the_second_of_a_write(self):
+        with self.at(2):
+            last_modified = self.client.get(PLAY_URL)["Last-Modified"]
+            # A write in the same second as the response above.
+            self.play.title = "Macbeth"
+            self.play.save()
+            response = self.client.get(PLAY_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(response.data["results"][0]["title"], "Macbeth")
+
+    def test_if_none_match(self):
+        etag = self.client.get(PLAY_URL)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(PLAY_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_if_modified_since(self):
+        with self.at(2):
+            last_modified = self.client.get(PLAY_URL)["Last-Modified"]
+            response = self.client.get(PLAY_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_depends_on_url(self):
+        etag = self.client.get(PLAY_URL)["ETag"]
+        response = self.client.get(PLAY_URL, {"title": "Hamlet"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_changes_on_write(self):
+        etag = self.client.get(PLAY_URL)["ETag"]
+        self.play.title = "Macbeth"
+        self.play.save()
+        response = self.client.get(PLAY_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_performance_etag_changes_on_reservation(self):
+        etag = self.client.get(PERFORMANCE_URL)["ETag"]
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("theatre:reservation-list"),
+                {"tickets": [{"row": 1, "seat": 1, "performance": self.performance.id}]},
+                format="json",
+            )
+        response = self.client.get(PERFORMANCE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["tickets_available"], 199)
@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import Actor, Genre, Performance, Play, TheatreHall
+
+PLAY_URL = reverse("theatre:play-list")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+class FastSerializerTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            password="userpass",
+            email="user@example.com"
+        )
+        self.client.force_authenticate(self.user)
+        genres = [Genre.objects.create(name=name) for name in ("Drama", "Comedy")]
+        actors = [
+            Actor.objects.create(first_name="John", last_name="Doe"),
+            Actor.objects.create(first_name="Jane", last_name="Żółć"),
+        ]
+        halls = [
+            TheatreHall.objects.create(name="Main Hall", rows=10, seats_in_row=20),
+            TheatreHall.objects.create(name="Small Hall", rows=3, seats_in_row=4),
+        ]
+        for i in range(6):
+            play = Play.objects.create(title=f"Play {i}", description=f"Description “{i}”")
+            play.genres.set(genres[: i % 3])
+            play.actors.set(actors[i % 2:])
+            for day in range(1, 3):
+                performance = Performance.objects.create(
+                    play=play,
+                    theatre_hall=halls[i % 2],
+                    show_time=f"2023-09-{day:02d}T{10 + i}:30:00.123456Z",
+                )
+                self.client.post(
+                    RESERVATION_URL,
+                    {
+                        "tickets": [
+                            {"row": 1, "seat": seat, "performance": performance.id}
+                            for seat in range(1, day + 2)
+                        ]
+                    },
+                    format="json",
+                )
+
+    def get_both(self, url, params=None):
+        responses = []
+        for enabled in (False, True):
+            cache.clear()
+            with override_settings(FAST_READ_SERIALIZERS=enabled):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            responses.append(response.content)
+        return responses
+
+    def test_play_list_is_identical(self):
+        default, fast = self.get_both(PLAY_URL)
+        self.assertEqual(default, fast)
+        default, fast = self.get_both(PLAY_URL, {"title": "Play 1", "page_size": 3})
+        self.assertEqual(default, fast)
+
+    def test_performance_list_is_identical(self):
+        default, fast = self.get_both(PERFORMANCE_URL, {"page_size": 20})
+        self.assertEqual(default, fast)
+        default, fast = self.get_both(PERFORMANCE_URL, {"pagination": "cursor", "date": "2023-09-02"})
+        self.assertEqual(default, fast)
+
+    def test_reservation_list_is_identical(self):
+        default, fast = self.get_both(RESERVATION_URL, {"page_size": 20})
+        self.assertEqual(default, fast)
+
+    @override_settings(FAST_READ_SERIALIZERS=True)
+    def test_fast_list_uses_fewer_queries(self):
+        cache.clear()
+        # reservations, tickets, performances with plays and halls, count
+        with self.assertNumQueries(4):
+            self.client.get(RESERVATION_URL, {"page_size": 20})
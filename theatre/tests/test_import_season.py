@@ -0,0 +1,128 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+
+from theatre.models import Actor, Genre, Performance, Play, TheatreHall
+
+
+class ImportSeasonCommandTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        TheatreHall.objects.create(name="Main Hall", rows=10, seats_in_row=20)
+        Genre.objects.create(name="Drama")
+        Actor.objects.create(first_name="John", last_name="Doe")
+
+    def write(self, name, content):
+        path = Path(self.directory.name) / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def call(self, *args):
+        out = StringIO()
+        call_command("import_season", *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_csv(self):
+        plays = self.write(
+            "plays.csv",
+            "title,description,genres,actors\n"
+            "Hamlet,A classic tragedy,Drama|Tragedy,John Doe|Jane Smith\n"
+            "Cats,A musical,Musical,\n",
+        )
+        performances = self.write(
+            "performances.csv",
+            "play,theatre_hall,show_time\n"
+            "Hamlet,Main Hall,2023-09-10T14:30:00Z\n"
+            "Cats,Main Hall,2023-09-11 19:00\n",
+        )
+
+        output = self.call("--plays", plays, "--performances", performances)
+
+        self.assertIn("Imported 2 plays and 2 performances", output)
+        self.assertIn("rows/s", output)
+        hamlet = Play.objects.get(title="Hamlet")
+        self.assertEqual(
+            sorted(hamlet.genres.values_list("name", flat=True)), ["Drama", "Tragedy"]
+        )
+        self.assertEqual(
+            sorted(actor.full_name for actor in hamlet.actors.all()),
+            ["Jane Smith", "John Doe"],
+        )
+        self.assertEqual(Genre.objects.count(), 3)
+        self.assertEqual(Actor.objects.count(), 2)
+        self.assertEqual(Performance.objects.count(), 2)
+
+    def test_import_json_skips_existing_plays(self):
+        Play.objects.create(title="Hamlet", description="Already there")
+        plays = self.write(
+            "plays.json",
+            json.dumps(
+                [
+                    {"title": "Hamlet", "description": "Duplicate"},
+                    {"title": "Cats", "description": "A musical", "genres": ["Drama"]},
+                ]
+            ),
+        )
+
+        output = self.call("--plays", plays)
+
+        self.assertIn("Skipped 1 plays", output)
+        self.assertEqual(Play.objects.count(), 2)
+        self.assertEqual(Play.objects.get(title="Hamlet").description, "Already there")
+
+    def test_dry_run_rolls_back(self):
+        plays = self.write(
+            "plays.json",
+            json.dumps([{"title": "Cats", "description": "A musical", "genres": ["Musical"]}]),
+        )
+
+        output = self.call("--plays", plays, "--dry-run")
+
+        self.assertIn("Validated 1 plays", output)
+        self.assertFalse(Play.objects.filter(title="Cats").exists())
+        self.assertFalse(Genre.objects.filter(name="Musical").exists())
+
+    def test_unknown_references_abort_import(self):
+        performances = self.write(
+            "performances.csv",
+            "play,theatre_hall,show_time\n"
+            "Hamlet,Small Hall,soon\n",
+        )
+
+        with self.assertRaisesMessage(CommandError, "unknown play 'Hamlet'"):
+            self.call("--performances", performances)
+        self.assertEqual(Performance.objects.count(), 0)
+
+    def test_duplicate_titles_abort_import(self):
+        plays = self.write(
+            "plays.csv",
+            "title,description,genres,actors\n"
+            "Hamlet,A classic tragedy,,\n"
+            "Hamlet,Again,,\n",
+        )
+
+        with self.assertRaisesMessage(
+            CommandError, "2: duplicate title 'Hamlet' (first on line 1)"
+        ):
+            self.call("--plays", plays)
+        self.assertEqual(Play.objects.count(), 0)
+
+    def test_ambiguous_play_aborts_import(self):
+        Play.objects.create(title="Hamlet", description="First")
+        Play.objects.create(title="Hamlet", description="Second")
+        performances = self.write(
+            "performances.csv",
+            "play,theatre_hall,show_time\n"
+            "Hamlet,Main Hall,2023-09-10T14:30:00Z\n",
+        )
+
+        with self.assertRaisesMessage(
+            CommandError, "1: ambiguous play 'Hamlet' matches 2 rows"
+        ):
+            self.call("--performances", performances)
+        self.assertEqual(Performance.objects.count(), 0)
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import Performance, Play, Reservation, TheatreHall, Ticket
+
+PLAY_URL = reverse("theatre:play-list")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+
+
+def count_queries(context):
+    return [
+        query for query in context.captured_queries
+        if query["sql"].startswith("SELECT COUNT(*)")
+    ]
+
+
+class CachedCountPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(
+            password="adminpass",
+            email="admin@example.com"
+        )
+        self.client.force_authenticate(self.admin_user)
+        for i in range(12):
+            Play.objects.create(title=f"Play {i}", description="A play")
+
+    def test_count_is_cached(self):
+        response = self.client.get(PLAY_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 12)
+        self.assertFalse(response.data["count_is_approximate"])
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(PLAY_URL, {"page": 2})
+        self.assertEqual(response.data["count"], 12)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(count_queries(context), [])
+
+    def test_count_is_cached_per_filter(self):
+        self.client.get(PLAY_URL)
+        response = self.client.get(PLAY_URL, {"title": "Play 1"})
+        self.assertEqual(response.data["count"], 3)
+
+    def test_count_is_invalidated_on_write(self):
+        self.client.get(PLAY_URL)
+        Play.objects.create(title="New", description="New play")
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(PLAY_URL)
+        self.assertEqual(response.data["count"], 13)
+        self.assertEqual(len(count_queries(context)), 1)
+
+    def test_count_is_invalidated_by_dependencies(self):
+        theatre_hall = TheatreHall.objects.create(name="Box", rows=1, seats_in_row=1)
+        performance = Performance.objects.create(
+            play=Play.objects.first(),
+            theatre_hall=theatre_hall,
+            show_time="2023-09-10T14:30:00Z",
+        )
+        response = self.client.get(PERFORMANCE_URL, {"available": "false"})
+        self.assertEqual(response.data["count"], 0)
+
+        # Selling the last seat bumps Ticket, not Performance.
+        Ticket.objects.create(
+            reservation=Reservation.objects.create(user=self.admin_user),
+            performance=performance,
+            row=1,
+            seat=1,
+        )
+        response = self.client.get(PERFORMANCE_URL, {"available": "false"})
+        self.assertEqual(response.data["count"], 1)
@@ -1,19 +1,34 @@
+import base64
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from rest_framework.test import APIClient
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework import status
-from theatre.models import Performance, Play, TheatreHall
+from theatre.cache import get_versions
+from theatre.models import Performance, Play, Reservation, TheatreHall, Ticket
+from theatre.seat_map import build_bitmap, invalidate_seat_maps
 from theatre.serializers import PerformanceSerializer, PerformanceListSerializer
 from datetime import datetime
 
 from theatre.views import PerformanceApiViewSet
 
 PERFORMANCE_URL = reverse("theatre:performance-list")
+PERFORMANCE_BULK_URL = reverse("theatre:performance-bulk-update")
 
 def detail_url(performance_id):
     return reverse("theatre:performance-detail", args=[performance_id])
 
+def seats_url(performance_id):
+    return reverse("theatre:performance-seats", args=[performance_id])
+
 class PerformanceApiViewSetTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -85,6 +100,79 @@ class PerformanceApiViewSetTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["results"]), 1)
 
+    def test_filter_by_date_range(self):
+        Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time="2023-09-11T23:59:59Z"
+        )
+        Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time="2023-09-12T00:00:00Z"
+        )
+        response = self.client.get(
+            PERFORMANCE_URL, {"date_from": "2023-09-10", "date_to": "2023-09-11"}
+        )
+        self.assertEqual(response.data["count"], 2)
+        response = self.client.get(PERFORMANCE_URL, {"date": "2023-09-12"})
+        self.assertEqual(response.data["count"], 1)
+
+    def test_filter_by_play_and_theatre_hall(self):
+        other_play = Play.objects.create(title="Macbeth", description="Another tragedy")
+        other_hall = TheatreHall.objects.create(name="Small Hall", rows=5, seats_in_row=5)
+        Performance.objects.create(
+            play=other_play,
+            theatre_hall=other_hall,
+            show_time="2023-09-10T18:00:00Z"
+        )
+        response = self.client.get(PERFORMANCE_URL, {"play": other_play.id})
+        self.assertEqual(response.data["count"], 1)
+        response = self.client.get(PERFORMANCE_URL, {"theatre_hall": self.theatre_hall.id})
+        self.assertEqual(response.data["count"], 1)
+        response = self.client.get(
+            PERFORMANCE_URL, {"date": "2023-09-10", "play": self.play.id}
+        )
+        self.assertEqual(response.data["count"], 1)
+
+    def test_filter_with_invalid_values(self):
+        response = self.client.get(PERFORMANCE_URL, {"date": "10.09.2023"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(PERFORMANCE_URL, {"play": "hamlet"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def explain_list_query(self, params):
+        view = PerformanceApiViewSet(
+            action="list",
+            request=Request(APIRequestFactory().get(PERFORMANCE_URL, params)),
+            format_kwarg=None,
+        )
+        queryset = view.get_queryset()
+        if connection.vendor == "postgresql":
+            # The test tables are tiny, so make the planner pick indexes.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def test_date_filters_use_show_time_index(self):
+        for params in (
+            {"date": "2023-09-10"},
+            {"date_from": "2023-09-01"},
+            {"date_from": "2023-09-01", "date_to": "2023-09-30"},
+        ):
+            plan = self.explain_list_query(params)
+            self.assertIn("performance_show_time_play_idx", plan, params)
+
+    def test_filters_do_not_scan_performances(self):
+        for params in (
+            {"date": "2023-09-10", "play": self.play.id},
+            {"play": self.play.id},
+            {"theatre_hall": self.theatre_hall.id},
+        ):
+            plan = self.explain_list_query(params)
+            self.assertNotIn("SCAN theatre_performance", plan, params)
+            self.assertNotIn("Seq Scan on theatre_performance", plan, params)
+
     def test_pagination(self):
         # Create more performances to exceed the default page size
         for i in range(15):
@@ -100,7 +188,272 @@ class PerformanceApiViewSetTests(TestCase):
         self.assertIn("next", response.data)
         self.assertIn("previous", response.data)
 
+    def test_tickets_available(self):
+        reservation = Reservation.objects.create(user=self.admin_user)
+        Ticket.objects.create(reservation=reservation, performance=self.performance, row=1, seat=1)
+        Ticket.objects.create(reservation=reservation, performance=self.performance, row=1, seat=2)
+
+        response = self.client.get(PERFORMANCE_URL)
+        self.assertEqual(response.data["results"][0]["tickets_available"], 198)
+        response = self.client.get(detail_url(self.performance.id))
+        self.assertEqual(response.data["tickets_available"], 198)
+
+    def test_tickets_sold_counter(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("theatre:reservation-list"),
+                {
+                    "tickets": [
+                        {"row": 1, "seat": seat, "performance": self.performance.id}
+                        for seat in (1, 2, 3)
+                    ]
+                },
+                format="json",
+            )
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 3)
+
+        Ticket.objects.filter(seat=1).delete()
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+        Reservation.objects.all().delete()
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 0)
+
+    def test_tickets_sold_is_read_only(self):
+        response = self.client.patch(
+            detail_url(self.performance.id), {"tickets_sold": 100}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 0)
+
+    def test_save_keeps_tickets_sold(self):
+        performance = Performance.objects.get(id=self.performance.id)
+        reservation = Reservation.objects.create(user=self.admin_user)
+        Ticket.objects.create(reservation=reservation, performance=self.performance, row=1, seat=1)
+
+        performance.show_time = "2023-09-11T14:30:00Z"
+        performance.save()
+        performance.save(update_fields=["show_time", "tickets_sold"])
+        performance.refresh_from_db()
+        self.assertEqual(performance.tickets_sold, 1)
+        self.assertEqual(performance.show_time.day, 11)
+
+    def test_reconcile_tickets_sold(self):
+        reservation = Reservation.objects.create(user=self.admin_user)
+        Ticket.objects.create(reservation=reservation, performance=self.performance, row=1, seat=1)
+        Performance.objects.filter(id=self.performance.id).update(tickets_sold=5)
+
+        out = StringIO()
+        call_command("reconcile_tickets_sold", stdout=out)
+        self.assertIn(f"Performance {self.performance.id}: tickets_sold=5, tickets=1", out.getvalue())
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 5)
+
+        [version] = get_versions(Performance)
+        out = StringIO()
+        call_command("reconcile_tickets_sold", "--fix", stdout=out)
+        self.assertIn("Fixed 1 performances", out.getvalue())
+        self.assertNotEqual(get_versions(Performance), [version])
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 1)
+
+    def test_list_query_count_does_not_depend_on_page_size(self):
+        reservation = Reservation.objects.create(user=self.admin_user)
+        for i in range(15):
+            performance = Performance.objects.create(
+                play=Play.objects.create(title=f"Play {i}", description="A play"),
+                theatre_hall=self.theatre_hall,
+                show_time="2023-09-12T16:00:00Z"
+            )
+            Ticket.objects.create(reservation=reservation, performance=performance, row=1, seat=1)
+
+        cache.clear()
+        with self.assertNumQueries(4):
+            response = self.client.get(PERFORMANCE_URL, {"page_size": 1})
+        self.assertEqual(len(response.data["results"]), 1)
+        cache.clear()
+        with self.assertNumQueries(4):
+            response = self.client.get(PERFORMANCE_URL, {"page_size": 16})
+        self.assertEqual(len(response.data["results"]), 16)
+
+    def test_cursor_pagination(self):
+        for day in range(15, 0, -1):
+            Performance.objects.create(
+                play=self.play,
+                theatre_hall=self.theatre_hall,
+                show_time=f"2023-10-{day:02d}T19:00:00Z"
+            )
+
+        response = self.client.get(PERFORMANCE_URL, {"pagination": "cursor"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        first_page = response.data["results"]
+        self.assertEqual(len(first_page), 10)
+        self.assertEqual(first_page[0]["id"], self.performance.id)
+        show_times = [performance["show_time"] for performance in first_page]
+        self.assertEqual(show_times, sorted(show_times))
+
+        response = self.client.get(response.data["next"])
+        second_page = response.data["results"]
+        self.assertEqual(len(second_page), 6)
+        self.assertIsNone(response.data["next"])
+        self.assertGreater(second_page[0]["show_time"], first_page[-1]["show_time"])
+
+    def test_bulk_create_performances_in_one_insert(self):
+        payload = [
+            {
+                "play": self.play.id,
+                "theatre_hall": self.theatre_hall.id,
+                "show_time": f"2023-09-{day:02d}T19:00:00Z",
+            }
+            for day in range(11, 18)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(PERFORMANCE_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 7)
+        inserts = [
+            query for query in context.captured_queries
+            if query["sql"].startswith('INSERT INTO "theatre_performance"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Performance.objects.count(), 8)
+
+    def test_bulk_update_performances(self):
+        other = Performance.objects.create(
+            play=self.play, theatre_hall=self.theatre_hall, show_time="2023-09-11T14:30:00Z"
+        )
+        payload = [
+            {"id": self.performance.id, "show_time": "2023-09-10T19:00:00Z"},
+            {"id": other.id, "show_time": "2023-09-11T19:00:00Z"},
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(PERFORMANCE_BULK_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = [
+            query for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "theatre_performance"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            sorted(
+                Performance.objects.values_list("show_time__hour", flat=True)
+            ),
+            [19, 19],
+        )
+
+    def test_bulk_update_performances_invalid_item(self):
+        payload = [
+            {"id": self.performance.id, "show_time": "2023-09-10T19:00:00Z"},
+            {"id": self.performance.id, "play": 0},
+        ]
+        response = self.client.patch(PERFORMANCE_BULK_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("id", response.data[1])
+
     def test_permission(self):
         self.client.logout()  # Log out the admin user
         response = self.client.post(PERFORMANCE_URL, self.performance_data)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PerformanceSeatMapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            password="userpass",
+            email="user@example.com"
+        )
+        self.theatre_hall = TheatreHall.objects.create(name="Small Hall", rows=2, seats_in_row=5)
+        self.play = Play.objects.create(title="Hamlet", description="A classic tragedy")
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time="2023-09-10T14:30:00Z",
+        )
+        reservation = Reservation.objects.create(user=self.user)
+        for row, seat in [(1, 1), (1, 2), (2, 5)]:
+            Ticket.objects.create(
+                reservation=reservation, performance=self.performance, row=row, seat=seat
+            )
+
+    def test_seat_map_bitmap(self):
+        response = self.client.get(seats_url(self.performance.id))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rows"], 2)
+        self.assertEqual(response.data["seats_in_row"], 5)
+        self.assertEqual(response.data["tickets_sold"], 3)
+        self.assertEqual(response.data["encoding"], "bitmap")
+        # 11000 00001 -> 1100 0000 | 01.. ....
+        self.assertEqual(base64.b64decode(response.data["seats"]), bytes([0b11000000, 0b01000000]))
+
+    def test_seat_map_rle(self):
+        response = self.client.get(seats_url(self.performance.id), {"encoding": "rle"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["seats"], [0, 2, 7, 1])
+
+    def test_seat_map_is_cached(self):
+        self.client.get(seats_url(self.performance.id))
+        with self.assertNumQueries(0):
+            response = self.client.get(seats_url(self.performance.id))
+        self.assertEqual(response.data["tickets_sold"], 3)
+
+    def test_seat_map_invalidated_by_reservation(self):
+        self.client.get(seats_url(self.performance.id))
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("theatre:reservation-list"),
+                {"tickets": [{"row": 2, "seat": 1, "performance": self.performance.id}]},
+                format="json",
+            )
+        response = self.client.get(seats_url(self.performance.id))
+        self.assertEqual(response.data["tickets_sold"], 4)
+
+    def test_seat_map_invalidated_by_ticket_create(self):
+        self.client.get(seats_url(self.performance.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                reservation=Reservation.objects.create(user=self.user),
+                performance=self.performance,
+                row=2,
+                seat=1,
+            )
+        response = self.client.get(seats_url(self.performance.id), {"encoding": "rle"})
+        self.assertEqual(response.data["tickets_sold"], 4)
+        self.assertEqual(response.data["seats"], [0, 2, 3, 1, 3, 1])
+
+    def test_seat_map_built_before_invalidation_is_not_served(self):
+        def build_then_sell(performance):
+            bitmap = build_bitmap(performance)
+            # A reservation commits before this request caches its map.
+            Ticket.objects.create(
+                reservation=Reservation.objects.create(user=self.user),
+                performance=self.performance,
+                row=2,
+                seat=1,
+            )
+            invalidate_seat_maps([self.performance.id])
+            return bitmap
+
+        with mock.patch("theatre.seat_map.build_bitmap", side_effect=build_then_sell):
+            response = self.client.get(seats_url(self.performance.id))
+        self.assertEqual(response.data["tickets_sold"], 3)
+        response = self.client.get(seats_url(self.performance.id))
+        self.assertEqual(response.data["tickets_sold"], 4)
+
+    def test_seat_map_skips_seats_outside_the_hall(self):
+        self.theatre_hall.rows = 1
+        self.theatre_hall.save()
+        response = self.client.get(seats_url(self.performance.id), {"encoding": "rle"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["seats"], [0, 2, 3])
+
+    def test_seat_map_not_found(self):
+        response = self.client.get(seats_url(self.performance.id + 1))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,54 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import StatelessJWTAuthentication
+
+CATALOGUE_URLS = [
+    reverse(f"theatre:{name}-list")
+    for name in ("actor", "genre", "play", "performance", "theatrehall")
+]
+
+
+class AnonymousCatalogueReadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.authenticate = mock.patch.object(
+            StatelessJWTAuthentication,
+            "authenticate",
+            autospec=True,
+            side_effect=StatelessJWTAuthentication.authenticate,
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_anonymous_read_skips_authentication(self):
+        for url in CATALOGUE_URLS:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.authenticate.assert_not_called()
+
+    def test_read_with_credentials_is_authenticated(self):
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="userpass"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+        response = self.client.get(CATALOGUE_URLS[0])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.authenticate.assert_called_once()
+
+    def test_anonymous_write_is_rejected(self):
+        response = self.client.post(CATALOGUE_URLS[0], {"first_name": "John", "last_name": "Doe"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.authenticate.assert_called()
+
+    def test_invalid_token_on_read_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+        response = self.client.get(CATALOGUE_URLS[0])
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
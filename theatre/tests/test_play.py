@@ -89,6 +89,21 @@ class PlayApiViewSetTests(TestCase):
         print(response.data)
         self.assertEqual(len(response.data["results"]), 1)
 
+    def test_search(self):
+        Play.objects.create(title="Macbeth", description="A Scottish tragedy")
+        Play.objects.create(title="Twelfth Night", description="A comedy")
+
+        response = self.client.get(PLAY_URL, {"search": "tragedy"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(play["title"] for play in response.data["results"]),
+            ["Hamlet", "Macbeth"],
+        )
+        response = self.client.get(PLAY_URL, {"search": "night"})
+        self.assertEqual(
+            [play["title"] for play in response.data["results"]], ["Twelfth Night"]
+        )
+
     def test_pagination(self):
         # Create more plays to exceed the default page size
         for i in range(15):
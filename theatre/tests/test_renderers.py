@@ -0,0 +1,79 @@
+import datetime
+import json
+import decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+
+from theatre import renderers
+from theatre.renderers import FastJSONRenderer, NDJSONRenderer, StreamingJSONRenderer
+
+DATA = [
+    {
+        "id": 1,
+        "show_time": datetime.datetime(2023, 9, 10, 14, 30, tzinfo=datetime.timezone.utc),
+        "date": datetime.date(2023, 9, 10),
+        "price": decimal.Decimal("12.50"),
+        "title": "Żółć “quoted” \u2028\u2029",
+        "lazy": gettext_lazy("This field is required."),
+        "error": ErrorDetail("Invalid.", code="invalid"),
+        "nested": {"genres": [1, 2], "empty": None, "ratio": 0.5},
+    },
+    {"id": 2, "big": 2 ** 70},
+]
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_same_bytes_as_json_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(DATA), JSONRenderer().render(DATA))
+
+    def test_stdlib_fallback(self):
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(FastJSONRenderer().render(DATA), JSONRenderer().render(DATA))
+
+    def test_settings_use_json_renderer(self):
+        for attribute, value in (("compact", False), ("ensure_ascii", True)):
+            with self.subTest(attribute=attribute), mock.patch.object(
+                FastJSONRenderer, attribute, value
+            ), mock.patch.object(JSONRenderer, attribute, value):
+                self.assertEqual(
+                    FastJSONRenderer().render(DATA), JSONRenderer().render(DATA)
+                )
+                self.assertEqual(
+                    b"".join(StreamingJSONRenderer().stream(DATA)),
+                    JSONRenderer().render(DATA),
+                )
+
+    def test_floats(self):
+        data = {"small": 1e-05, "large": 1e20, "ratio": 0.1}
+        self.assertEqual(
+            json.loads(FastJSONRenderer().render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
+        self.assertEqual(
+            FastJSONRenderer().render({"nan": float("nan"), "inf": float("inf")}),
+            b'{"nan":null,"inf":null}',
+        )
+
+    def test_indent_uses_json_renderer(self):
+        context = {"indent": 2}
+        self.assertEqual(
+            FastJSONRenderer().render(DATA[:1], renderer_context=context),
+            JSONRenderer().render(DATA[:1], renderer_context=context),
+        )
+
+
+class StreamingRendererTests(SimpleTestCase):
+    def test_stream_json_array(self):
+        renderer = StreamingJSONRenderer()
+        chunks = list(renderer.stream(iter(DATA[:1])))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(b"".join(chunks), JSONRenderer().render(DATA[:1]))
+        self.assertEqual(b"".join(renderer.stream(iter([]))), b"[]")
+
+    def test_stream_ndjson(self):
+        lines = list(NDJSONRenderer().stream([{"id": 1}, {"id": 2}]))
+        self.assertEqual(lines, [b'{"id":1}\n', b'{"id":2}\n'])
@@ -0,0 +1,280 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre import locking
+from theatre.locking import LOCKING_STRATEGIES
+from theatre.models import Performance, Play, Reservation, TheatreHall, Ticket
+
+RESERVATION_URL = reverse("theatre:reservation-list")
+EXPORT_URL = reverse("theatre:reservation-export")
+
+
+class ReservationApiViewSetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            password="userpass",
+            email="user@example.com"
+        )
+        self.client.force_authenticate(self.user)
+        self.theatre_hall = TheatreHall.objects.create(name="Main Hall", rows=10, seats_in_row=20)
+        self.play = Play.objects.create(title="Hamlet", description="A classic tragedy")
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time="2023-09-10T14:30:00Z",
+        )
+
+    def reservation_payload(self, seats):
+        return {
+            "tickets": [
+                {"row": row, "seat": seat, "performance": self.performance.id}
+                for row, seat in seats
+            ]
+        }
+
+    def test_create_reservation(self):
+        payload = self.reservation_payload([(1, 1), (1, 2), (2, 5)])
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 3)
+        self.assertEqual(
+            sorted(ticket["id"] for ticket in response.data["tickets"]),
+            sorted(Ticket.objects.values_list("id", flat=True)),
+        )
+
+    def test_create_reservation_inserts_tickets_in_one_query(self):
+        payload = self.reservation_payload([(1, seat) for seat in range(1, 21)])
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(RESERVATION_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        ticket_inserts = [
+            query for query in context.captured_queries
+            if query["sql"].startswith('INSERT INTO "theatre_ticket"')
+        ]
+        self.assertEqual(len(ticket_inserts), 1)
+        self.assertEqual(Ticket.objects.count(), 20)
+
+    def test_create_reservation_seat_out_of_range(self):
+        payload = self.reservation_payload([(1, 1), (11, 1)])
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tickets"][0], {})
+        self.assertIn("row", response.data["tickets"][1])
+        self.assertEqual(Reservation.objects.count(), 0)
+        self.assertEqual(Ticket.objects.count(), 0)
+
+    def test_create_reservation_duplicate_seat_in_request(self):
+        payload = self.reservation_payload([(1, 1), (1, 1)])
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Ticket.objects.count(), 0)
+
+    def test_create_reservation_reports_all_ticket_errors(self):
+        payload = self.reservation_payload([(1, 1), (11, 21), (1, 1)])
+        payload["tickets"].append({"row": 1, "seat": 2, "performance": 0})
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data["tickets"]
+        self.assertEqual(errors[0], {})
+        self.assertEqual(set(errors[1]), {"row", "seat"})
+        self.assertEqual(set(errors[2]), {"non_field_errors"})
+        self.assertEqual(set(errors[3]), {"performance"})
+
+    def test_create_reservation_validates_tickets_in_one_query(self):
+        def count_selects(seats):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(
+                    RESERVATION_URL, self.reservation_payload(seats), format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return [
+                query["sql"] for query in context.captured_queries
+                if query["sql"].startswith("SELECT")
+                and 'FROM "theatre_performance"' in query["sql"]
+            ]
+
+        self.assertEqual(len(count_selects([(1, 1)])), 1)
+        self.assertEqual(len(count_selects([(2, seat) for seat in range(1, 21)])), 1)
+
+    def test_create_reservation_query_count(self):
+        # Performances, holds, savepoint, reservation, tickets and release,
+        # whatever the number of tickets; tickets_sold is counted on commit.
+        for seats in ([(1, 1)], [(2, seat) for seat in range(1, 21)]):
+            with self.assertNumQueries(6):
+                response = self.client.post(
+                    RESERVATION_URL, self.reservation_payload(seats), format="json"
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_create_reservation_seat_taken(self):
+        self.client.post(
+            RESERVATION_URL, self.reservation_payload([(1, 1)]), format="json"
+        )
+        payload = self.reservation_payload([(1, 1), (1, 2)])
+        response = self.client.post(RESERVATION_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["seats"],
+            [{"performance": self.performance.id, "row": 1, "seat": 1}],
+        )
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_create_reservation_counts_tickets_after_commit(self):
+        payload = self.reservation_payload([(1, 1), (1, 2)])
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(RESERVATION_URL, payload, format="json")
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 0)
+        for callback in callbacks:
+            callback()
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+
+    def test_create_reservation_does_not_pre_check_seats(self):
+        payload = self.reservation_payload([(1, seat) for seat in range(1, 6)])
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(RESERVATION_URL, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        ticket_selects = [
+            query for query in context.captured_queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "theatre_ticket"' in query["sql"]
+        ]
+        self.assertEqual(ticket_selects, [])
+
+    def test_create_reservation_with_each_locking_strategy(self):
+        # "seats" needs the seat inventory, see test_seat_inventory.
+        strategies = [strategy for strategy in LOCKING_STRATEGIES if strategy != "seats"]
+        for seat, strategy in enumerate(strategies, start=1):
+            with self.subTest(strategy=strategy), self.settings(
+                RESERVATION_LOCKING=strategy
+            ):
+                response = self.client.post(
+                    RESERVATION_URL, self.reservation_payload([(1, seat)]), format="json"
+                )
+                self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_advisory_lock_keys_fit_int4(self):
+        tickets = [
+            Ticket(performance_id=performance_id, row=1, seat=1)
+            for performance_id in (7, 2**31 - 1, 2**31, 2**40 + 5)
+        ]
+        with self.settings(RESERVATION_LOCKING="advisory"), mock.patch.object(
+            locking, "connection"
+        ) as connection_mock:
+            connection_mock.vendor = "postgresql"
+            locking.lock_seats(tickets)
+        cursor = connection_mock.cursor.return_value.__enter__.return_value
+        keys = [call.args[1][1] for call in cursor.execute.call_args_list]
+        self.assertEqual(keys, [7, 2**31 - 1, -(2**31), 5])
+        for key in keys:
+            self.assertTrue(-(2**31) <= key < 2**31)
+
+    def test_unknown_locking_strategy(self):
+        with self.settings(RESERVATION_LOCKING="table"):
+            with self.assertRaises(ImproperlyConfigured):
+                self.client.post(
+                    RESERVATION_URL, self.reservation_payload([(1, 1)]), format="json"
+                )
+
+    def test_list_reservations(self):
+        self.client.post(
+            RESERVATION_URL, self.reservation_payload([(3, 4)]), format="json"
+        )
+        response = self.client.get(RESERVATION_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        ticket = response.data["results"][0]["tickets"][0]
+        self.assertEqual(ticket["performance_play_title"], self.play.title)
+
+    def test_list_reservations_cursor_pagination(self):
+        for seat in range(1, 13):
+            self.client.post(
+                RESERVATION_URL, self.reservation_payload([(1, seat)]), format="json"
+            )
+
+        response = self.client.get(RESERVATION_URL, {"pagination": "cursor"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [reservation["id"] for reservation in response.data["results"]]
+        self.assertEqual(len(ids), 10)
+        response = self.client.get(response.data["next"])
+        ids += [reservation["id"] for reservation in response.data["results"]]
+        self.assertEqual(ids, list(Reservation.objects.order_by("created_at", "id").values_list("id", flat=True)))
+
+    def test_permission(self):
+        self.client.logout()
+        response = self.client.post(
+            RESERVATION_URL, self.reservation_payload([(1, 1)]), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ReservationExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(
+            password="adminpass",
+            email="admin@example.com"
+        )
+        self.client.force_authenticate(self.admin_user)
+        theatre_hall = TheatreHall.objects.create(name="Main Hall", rows=10, seats_in_row=20)
+        play = Play.objects.create(title="Hamlet", description="A classic tragedy")
+        self.performance = Performance.objects.create(
+            play=play, theatre_hall=theatre_hall, show_time="2023-09-10T14:30:00Z"
+        )
+        for created_at, seats in (("2023-08-31T23:00:00Z", [1]), ("2023-09-01T10:00:00Z", [2, 3])):
+            reservation = Reservation.objects.create(user=self.admin_user)
+            Reservation.objects.filter(pk=reservation.pk).update(created_at=created_at)
+            for seat in seats:
+                Ticket.objects.create(
+                    reservation=reservation, performance=self.performance, row=1, seat=seat
+                )
+
+    def test_export_csv(self):
+        response = self.client.get(EXPORT_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            lines[0],
+            "reservation_id,reservation_created_at,user_email,ticket_id,"
+            "performance_id,show_time,play,theatre_hall,row,seat",
+        )
+        self.assertEqual(len(lines), 4)
+        self.assertIn(",2023-08-31T23:00:00Z,admin@example.com,", lines[1])
+        self.assertTrue(lines[1].endswith(",2023-09-10T14:30:00Z,Hamlet,Main Hall,1,1"))
+
+    def test_export_ndjson_for_month(self):
+        response = self.client.get(EXPORT_URL, {"month": "2023-09", "format": "ndjson"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual([row["seat"] for row in rows], [2, 3])
+        self.assertEqual(rows[0]["play"], "Hamlet")
+
+    def test_export_invalid_month(self):
+        response = self.client.get(EXPORT_URL, {"month": "09.2023"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(password="userpass", email="user@example.com")
+        )
+        response = self.client.get(EXPORT_URL)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
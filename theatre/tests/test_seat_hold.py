@@ -0,0 +1,200 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import Performance, Play, Reservation, SeatHold, TheatreHall, Ticket
+
+HOLD_URL = reverse("theatre:seathold-list")
+CONFIRM_URL = reverse("theatre:seathold-confirm")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+def detail_url(hold_id):
+    return reverse("theatre:seathold-detail", args=[hold_id])
+
+
+class SeatHoldApiViewSetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            password="userpass",
+            email="user@example.com"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            password="userpass",
+            email="other@example.com"
+        )
+        self.client.force_authenticate(self.user)
+        theatre_hall = TheatreHall.objects.create(name="Main Hall", rows=10, seats_in_row=20)
+        play = Play.objects.create(title="Hamlet", description="A classic tragedy")
+        self.performance = Performance.objects.create(
+            play=play, theatre_hall=theatre_hall, show_time="2023-09-10T14:30:00Z"
+        )
+
+    def seats_payload(self, seats):
+        return [
+            {"row": row, "seat": seat, "performance": self.performance.id}
+            for row, seat in seats
+        ]
+
+    def hold(self, user, row, seat, expires_in=timedelta(minutes=10)):
+        return SeatHold.objects.create(
+            user=user,
+            performance=self.performance,
+            row=row,
+            seat=seat,
+            expires_at=timezone.now() + expires_in,
+        )
+
+    def test_hold_request_size_is_limited(self):
+        with self.settings(SEAT_HOLD_MAX_SEATS=3):
+            response = self.client.post(
+                HOLD_URL, self.seats_payload([(1, seat) for seat in range(1, 5)]), format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(SeatHold.objects.count(), 0)
+
+    def test_active_holds_per_user_are_limited(self):
+        self.hold(self.user, 1, 1)
+        self.hold(self.user, 1, 2)
+        self.hold(self.user, 1, 3, expires_in=timedelta(minutes=-1))
+        with self.settings(SEAT_HOLD_MAX_SEATS=3):
+            response = self.client.post(
+                HOLD_URL, self.seats_payload([(2, 1), (2, 2)]), format="json"
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("non_field_errors", response.data)
+            response = self.client.post(
+                HOLD_URL, self.seats_payload([(2, 1)]), format="json"
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.client.force_authenticate(self.other_user)
+            response = self.client.post(
+                HOLD_URL, self.seats_payload([(3, 1), (3, 2), (3, 3)]), format="json"
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_hold_seats_in_one_insert(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                HOLD_URL, self.seats_payload([(1, 1), (1, 2)]), format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 2)
+        self.assertIn("expires_at", response.data[0])
+        inserts = [
+            query for query in context.captured_queries
+            if query["sql"].startswith('INSERT INTO "theatre_seathold"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(SeatHold.objects.filter(user=self.user).count(), 2)
+
+    def test_hold_seat_held_by_other_user(self):
+        self.hold(self.other_user, 1, 1)
+        response = self.client.post(
+            HOLD_URL, self.seats_payload([(1, 1), (1, 2)]), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["seats"],
+            [{"performance": self.performance.id, "row": 1, "seat": 1}],
+        )
+        self.assertEqual(SeatHold.objects.count(), 1)
+
+    def test_hold_replaces_expired_hold(self):
+        self.hold(self.other_user, 1, 1, expires_in=timedelta(minutes=-1))
+        response = self.client.post(
+            HOLD_URL, self.seats_payload([(1, 1)]), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+
+    def test_hold_sold_seat(self):
+        reservation = Reservation.objects.create(user=self.other_user)
+        Ticket.objects.create(
+            reservation=reservation, performance=self.performance, row=1, seat=1
+        )
+        response = self.client.post(
+            HOLD_URL, self.seats_payload([(1, 1)]), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_hold_seat_out_of_range(self):
+        response = self.client.post(
+            HOLD_URL, self.seats_payload([(11, 1)]), format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_only_own_active_holds(self):
+        own = self.hold(self.user, 1, 1)
+        self.hold(self.user, 1, 2, expires_in=timedelta(minutes=-1))
+        self.hold(self.other_user, 1, 3)
+        response = self.client.get(HOLD_URL)
+        self.assertEqual([hold["id"] for hold in response.data], [own.id])
+
+    def test_release_hold_in_one_delete(self):
+        hold = self.hold(self.user, 1, 1)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.delete(detail_url(hold.id))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            [query["sql"].split()[0] for query in context.captured_queries],
+            ["DELETE"],
+        )
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_release_other_users_hold(self):
+        hold = self.hold(self.other_user, 1, 1)
+        response = self.client.delete(detail_url(hold.id))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(SeatHold.objects.exists())
+
+    def test_confirm_holds(self):
+        first = self.hold(self.user, 1, 1)
+        self.hold(self.user, 1, 2)
+        response = self.client.post(CONFIRM_URL, {"holds": [first.id]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["tickets"]), 1)
+        self.assertEqual(Ticket.objects.get().seat, 1)
+        self.assertEqual(list(SeatHold.objects.values_list("seat", flat=True)), [2])
+
+        response = self.client.post(CONFIRM_URL, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.count(), 2)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_confirm_expired_hold(self):
+        hold = self.hold(self.user, 1, 1, expires_in=timedelta(minutes=-1))
+        response = self.client.post(CONFIRM_URL, {"holds": [hold.id]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_reservation_respects_other_users_holds(self):
+        self.hold(self.other_user, 1, 1)
+        response = self.client.post(
+            RESERVATION_URL, {"tickets": self.seats_payload([(1, 1)])}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        self.hold(self.user, 1, 2)
+        response = self.client.post(
+            RESERVATION_URL, {"tickets": self.seats_payload([(1, 2)])}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_reap_seat_holds(self):
+        self.hold(self.user, 1, 1)
+        self.hold(self.user, 1, 2, expires_in=timedelta(minutes=-1))
+        out = StringIO()
+        call_command("reap_seat_holds", stdout=out)
+        self.assertIn("Deleted 1 expired seat holds", out.getvalue())
+        self.assertEqual(list(SeatHold.objects.values_list("seat", flat=True)), [1])
@@ -0,0 +1,167 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import (
+    Performance,
+    PerformanceSeat,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+PERFORMANCE_URL = reverse("theatre:performance-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+@override_settings(SEAT_INVENTORY=True)
+class SeatInventoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            password="adminpass",
+            email="admin@example.com"
+        )
+        self.client.force_authenticate(self.user)
+        self.theatre_hall = TheatreHall.objects.create(name="Small Hall", rows=2, seats_in_row=3)
+        self.play = Play.objects.create(title="Hamlet", description="A classic tragedy")
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time="2023-09-10T14:30:00Z",
+        )
+
+    def reserve(self, seats):
+        # tickets_sold is counted on commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                RESERVATION_URL,
+                {
+                    "tickets": [
+                        {"row": row, "seat": seat, "performance": self.performance.id}
+                        for row, seat in seats
+                    ]
+                },
+                format="json",
+            )
+
+    def sold_seats(self):
+        return set(
+            PerformanceSeat.objects.filter(
+                performance=self.performance, sold=True
+            ).values_list("row", "seat")
+        )
+
+    def test_inventory_generated_on_create(self):
+        self.assertEqual(
+            set(self.performance.inventory.values_list("row", "seat", "sold")),
+            {(row, seat, False) for row in (1, 2) for seat in (1, 2, 3)},
+        )
+
+    def test_inventory_generated_on_bulk_create(self):
+        response = self.client.post(
+            PERFORMANCE_URL,
+            [
+                {
+                    "play": self.play.id,
+                    "theatre_hall": self.theatre_hall.id,
+                    "show_time": f"2023-09-1{day}T19:00:00Z",
+                }
+                for day in (1, 2)
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(PerformanceSeat.objects.count(), 18)
+
+    def test_reservation_marks_seats_sold(self):
+        response = self.reserve([(1, 1), (2, 3)])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.sold_seats(), {(1, 1), (2, 3)})
+
+        Reservation.objects.get().delete()
+        self.assertEqual(self.sold_seats(), set())
+
+    def test_seats_locking_reports_sold_seats(self):
+        self.reserve([(1, 1)])
+        with self.settings(RESERVATION_LOCKING="seats"):
+            response = self.reserve([(1, 1), (1, 2)])
+            self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+            self.assertEqual(
+                response.data["seats"],
+                [{"performance": self.performance.id, "row": 1, "seat": 1}],
+            )
+            response = self.reserve([(1, 2)])
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.sold_seats(), {(1, 1), (1, 2)})
+
+    def test_seat_map_uses_inventory(self):
+        self.reserve([(1, 1)])
+        Ticket.objects.all().delete()
+        PerformanceSeat.objects.filter(row=2, seat=3).update(sold=True)
+        response = self.client.get(
+            reverse("theatre:performance-seats", args=[self.performance.id])
+        )
+        self.assertEqual(response.data["tickets_sold"], 1)
+
+    def test_available_filter(self):
+        sold_out = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time="2023-09-11T14:30:00Z",
+        )
+        PerformanceSeat.objects.filter(performance=sold_out).update(sold=True)
+        for available, expected in (("true", self.performance.id), ("false", sold_out.id)):
+            response = self.client.get(PERFORMANCE_URL, {"available": available})
+            self.assertEqual(
+                [performance["id"] for performance in response.data["results"]],
+                [expected],
+            )
+
+    def test_build_seat_inventory(self):
+        self.reserve([(1, 2)])
+        PerformanceSeat.objects.all().delete()
+        out = StringIO()
+        call_command("build_seat_inventory", stdout=out)
+        self.assertIn("1 performances", out.getvalue())
+        self.assertEqual(self.performance.inventory.count(), 6)
+        self.assertEqual(self.sold_seats(), {(1, 2)})
+
+
+class AvailableFilterWithoutInventoryTests(TestCase):
+    def test_available_filter_counts_tickets(self):
+        user = get_user_model().objects.create_user(
+            password="userpass", email="user@example.com"
+        )
+        theatre_hall = TheatreHall.objects.create(name="Tiny Hall", rows=1, seats_in_row=1)
+        play = Play.objects.create(title="Hamlet", description="A classic tragedy")
+        free, sold_out = (
+            Performance.objects.create(
+                play=play, theatre_hall=theatre_hall, show_time=show_time
+            )
+            for show_time in ("2023-09-10T14:30:00Z", "2023-09-11T14:30:00Z")
+        )
+        Ticket.objects.create(
+            reservation=Reservation.objects.create(user=user),
+            performance=sold_out,
+            row=1,
+            seat=1,
+        )
+        self.assertFalse(PerformanceSeat.objects.exists())
+        client = APIClient()
+        for available, expected in (("true", free.id), ("false", sold_out.id)):
+            response = client.get(PERFORMANCE_URL, {"available": available})
+            self.assertEqual(
+                [performance["id"] for performance in response.data["results"]],
+                [expected],
+            )
+        response = client.get(PERFORMANCE_URL, {"available": "yes"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -8,6 +8,8 @@ from theatre.views import (
     PerformanceApiViewSet,
     TheatreHallApiViewSet,
     ReservationApiViewSet,
+    SeatHoldApiViewSet,
+    CacheStatsView,
 )
 
 router = DefaultRouter()
@@ -17,7 +19,10 @@ router.register("plays", PlayApiViewSet)
 router.register("performances", PerformanceApiViewSet)
 router.register("theatre_halls", TheatreHallApiViewSet)
 router.register("reservations", ReservationApiViewSet)
+router.register("holds", SeatHoldApiViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path("cache_stats/", CacheStatsView.as_view(), name="cache-stats"),
+]
 
 app_name = "theatre"
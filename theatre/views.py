@@ -1,14 +1,52 @@
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta
 
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils import timezone
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import generics, viewsets, mixins
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import generics, viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 
-from theatre.models import Actor, Genre, Play, Performance, TheatreHall, Reservation
-from theatre.permissions import IsAdminOrReadOnly
+from theatre.bulk import BulkModelMixin
+from theatre.cache import CachedResponseMixin, ConditionalGetMixin, get_stats
+from theatre.exceptions import SeatConflict
+from theatre.fast_serializers import (
+    FastListMixin,
+    datetime_to_representation,
+    PerformanceListValuesSerializer,
+    PlayDetailValuesSerializer,
+    ReservationListValuesSerializer,
+)
+from theatre.models import (
+    Actor,
+    Genre,
+    Play,
+    Performance,
+    PerformanceSeat,
+    TheatreHall,
+    Reservation,
+    SeatHold,
+    Ticket,
+    seats_filter,
+)
+from theatre.pagination import (
+    CachedCountPagination,
+    CreatedAtCursorPagination,
+    CursorPaginationMixin,
+    ShowTimeCursorPagination,
+    StandardResultsSetPagination,
+)
+from theatre.permissions import AnonymousReadMixin, IsAdminOrReadOnly
+from theatre.renderers import CSVRenderer, NDJSONRenderer
+from theatre.seat_map import ENCODINGS, get_seat_map
 from theatre.serializers import (
     ActorSerializer,
     GenreSerializer,
@@ -19,39 +57,69 @@ from theatre.serializers import (
     ReservationSerializer,
     ReservationListSerializer,
     PerformanceListSerializer,
+    SeatHoldSerializer,
+    SeatHoldConfirmSerializer,
 )
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = "page_size"
-    max_page_size = 20
+def seat_conflict_response(exc):
+    # The exception handler would flatten ``seats`` into the detail string.
+    return Response({"detail": exc.detail, "seats": exc.seats}, status=exc.status_code)
 
 
-class ActorApiViewSet(viewsets.ModelViewSet):
+class ActorApiViewSet(
+    AnonymousReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    BulkModelMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
     pagination_class = StandardResultsSetPagination
     permission_classes = (IsAdminOrReadOnly,)
+    cache_dependencies = (Actor,)
 
 
-class GenreApiViewSet(viewsets.ModelViewSet):
+class GenreApiViewSet(
+    AnonymousReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    BulkModelMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     pagination_class = StandardResultsSetPagination
     permission_classes = (IsAdminOrReadOnly,)
+    cache_dependencies = (Genre,)
 
 
-class TheatreHallApiViewSet(viewsets.ModelViewSet):
+class TheatreHallApiViewSet(
+    AnonymousReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    BulkModelMixin,
+    viewsets.ModelViewSet,
+):
     queryset = TheatreHall.objects.all()
     serializer_class = TheatreHallSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    cache_dependencies = (TheatreHall,)
 
 
-class PlayApiViewSet(viewsets.ModelViewSet):
+class PlayApiViewSet(
+    AnonymousReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Play.objects.all()
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CachedCountPagination
     permission_classes = (IsAdminOrReadOnly,)
+    cache_dependencies = (Play, Genre, Actor)
+    fast_serializer_class = PlayDetailValuesSerializer
 
     def get_serializer_class(self):
         if self.action in ("retrieve", "list"):
@@ -62,17 +130,28 @@ class PlayApiViewSet(viewsets.ModelViewSet):
         queryset = self.queryset
         queryset = queryset.prefetch_related("genres", "actors")
         title = self.request.query_params.get("title")
+        search = self.request.query_params.get("search")
 
         if title:
             queryset = queryset.filter(title__icontains=title)
+        if search:
+            queryset = queryset.search(search)
         return queryset
 
     @extend_schema(
         parameters=[
             OpenApiParameter(
                 "title",
-                type=OpenApiTypes.INT,
-                description="Filter by title id (ex. ?title=2)",
+                type=OpenApiTypes.STR,
+                description="Filter by part of the title (ex. ?title=hamlet)",
+            ),
+            OpenApiParameter(
+                "search",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Full-text search over title and description, "
+                    "most relevant first (ex. ?search=danish prince)"
+                ),
             ),
         ]
     )
@@ -80,10 +159,20 @@ class PlayApiViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class PerformanceApiViewSet(viewsets.ModelViewSet):
+class PerformanceApiViewSet(
+    AnonymousReadMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    FastListMixin,
+    BulkModelMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Performance.objects.all()
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CachedCountPagination
+    cursor_pagination_class = ShowTimeCursorPagination
     permission_classes = (IsAdminOrReadOnly,)
+    cache_dependencies = (Performance, Play, TheatreHall, Genre, Actor, Ticket)
+    fast_serializer_class = PerformanceListValuesSerializer
 
     def get_serializer_class(self):
         if self.action in ("retrieve", "list"):
@@ -94,14 +183,72 @@ class PerformanceApiViewSet(viewsets.ModelViewSet):
         queryset = self.queryset
 
         if self.action in ("retrieve", "list"):
-            queryset = queryset.select_related("play", "theatre_hall")
+            queryset = (
+                queryset.select_related("play", "theatre_hall")
+                .prefetch_related("play__genres", "play__actors")
+                .with_tickets_available()
+            )
+        elif self.action == "seats":
+            return queryset.select_related("theatre_hall")
 
-        date = self.request.query_params.get("date")
+        # Dates are turned into half-open show_time ranges in the current
+        # time zone instead of show_time__date, which casts the column and
+        # can not use performance_show_time_play_idx.
+        params = self.request.query_params
+        date = params.get("date")
         if date:
-            date = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(show_time__date=date)
+            start = self._start_of_day("date", date)
+            queryset = queryset.filter(
+                show_time__gte=start, show_time__lt=start + timedelta(days=1)
+            )
+
+        date_from = params.get("date_from")
+        if date_from:
+            queryset = queryset.filter(
+                show_time__gte=self._start_of_day("date_from", date_from)
+            )
+
+        date_to = params.get("date_to")
+        if date_to:
+            queryset = queryset.filter(
+                show_time__lt=self._start_of_day("date_to", date_to)
+                + timedelta(days=1)
+            )
+
+        for field in ("play", "theatre_hall"):
+            value = params.get(field)
+            if value:
+                if not value.isdigit():
+                    raise ValidationError({field: "A valid integer is required."})
+                queryset = queryset.filter(**{f"{field}_id": value})
+
+        available = params.get("available")
+        if available:
+            if available not in ("true", "false"):
+                raise ValidationError({"available": "Must be true or false."})
+            queryset = self._filter_available(queryset, available == "true")
         return queryset
 
+    @staticmethod
+    def _filter_available(queryset, available):
+        if settings.SEAT_INVENTORY:
+            # An index lookup on performance_seat_free_idx.
+            has_free_seats = Exists(
+                PerformanceSeat.objects.filter(performance=OuterRef("pk"), sold=False)
+            )
+        else:
+            capacity = F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
+            has_free_seats = Q(tickets_sold__lt=capacity)
+        return queryset.filter(has_free_seats if available else ~has_free_seats)
+
+    @staticmethod
+    def _start_of_day(param, value):
+        try:
+            date = datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise ValidationError({param: "Date has wrong format. Use YYYY-MM-DD."})
+        return timezone.make_aware(date)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -111,18 +258,90 @@ class PerformanceApiViewSet(viewsets.ModelViewSet):
                     "Filter by datetime of Performance (ex. ?date=2022-10-23)"
                 ),
             ),
+            OpenApiParameter(
+                "date_from",
+                type=OpenApiTypes.DATE,
+                description=(
+                    "Performances on or after the date (ex. ?date_from=2022-10-23)"
+                ),
+            ),
+            OpenApiParameter(
+                "date_to",
+                type=OpenApiTypes.DATE,
+                description=(
+                    "Performances on or before the date (ex. ?date_to=2022-10-30)"
+                ),
+            ),
+            OpenApiParameter(
+                "play",
+                type=OpenApiTypes.INT,
+                description="Filter by play id (ex. ?play=2)",
+            ),
+            OpenApiParameter(
+                "theatre_hall",
+                type=OpenApiTypes.INT,
+                description="Filter by theatre hall id (ex. ?theatre_hall=1)",
+            ),
+            OpenApiParameter(
+                "available",
+                type=OpenApiTypes.BOOL,
+                description=(
+                    "Only performances with free seats, or only sold-out ones "
+                    "(ex. ?available=true)"
+                ),
+            ),
+            OpenApiParameter(
+                "pagination",
+                type=OpenApiTypes.STR,
+                enum=["cursor"],
+                description=(
+                    "Use cursor pagination ordered by show time "
+                    "(ex. ?pagination=cursor)"
+                ),
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "encoding",
+                type=OpenApiTypes.STR,
+                enum=ENCODINGS,
+                description=(
+                    "Seat map encoding: base64 row-major bitmap of sold seats "
+                    "or run lengths alternating free/sold (ex. ?encoding=rle)"
+                ),
+            ),
+        ],
+        responses=OpenApiTypes.OBJECT,
+    )
+    @action(detail=True, methods=["get"])
+    def seats(self, request, pk=None):
+        encoding = request.query_params.get("encoding", "bitmap")
+        if encoding not in ENCODINGS:
+            encoding = "bitmap"
+        try:
+            performance_id = int(pk)
+        except ValueError:
+            raise Http404
+        return Response(get_seat_map(performance_id, self.get_object, encoding))
+
 
 class ReservationApiViewSet(
-    mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet
+    CursorPaginationMixin,
+    FastListMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    viewsets.GenericViewSet,
 ):
     queryset = Reservation.objects.all()
     pagination_class = StandardResultsSetPagination
+    cursor_pagination_class = CreatedAtCursorPagination
     permission_classes = (IsAuthenticated,)
+    fast_serializer_class = ReservationListValuesSerializer
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -130,7 +349,9 @@ class ReservationApiViewSet(
         return ReservationSerializer
 
     def get_queryset(self):
-        queryset = Reservation.objects.filter(user=self.request.user).prefetch_related(
+        queryset = Reservation.objects.filter(
+            user_id=self.request.user.id
+        ).prefetch_related(
             "tickets",
             "tickets__performance__play",
             "tickets__performance__theatre_hall",
@@ -139,5 +360,281 @@ class ReservationApiViewSet(
 
         return queryset
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "pagination",
+                type=OpenApiTypes.STR,
+                enum=["cursor"],
+                description=(
+                    "Use cursor pagination ordered by creation time "
+                    "(ex. ?pagination=cursor)"
+                ),
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "month",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Only reservations created in the month (ex. ?month=2023-09)"
+                ),
+            ),
+            OpenApiParameter(
+                "format",
+                type=OpenApiTypes.STR,
+                enum=["csv", "ndjson"],
+                description="Export format (ex. ?format=ndjson), CSV by default",
+            ),
+        ],
+        responses={(200, "text/csv"): OpenApiTypes.STR},
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=(IsAdminUser,),
+        renderer_classes=(CSVRenderer, NDJSONRenderer),
+    )
+    def export(self, request):
+        """Stream every ticket with its reservation, performance, play and hall."""
+        tickets = Ticket.objects.order_by("reservation_id", "id")
+        month = request.query_params.get("month")
+        if month:
+            try:
+                start = timezone.make_aware(datetime.strptime(month, "%Y-%m"))
+            except ValueError:
+                raise ValidationError({"month": "Month has wrong format. Use YYYY-MM."})
+            end = (start + timedelta(days=32)).replace(day=1)
+            tickets = tickets.filter(
+                reservation__created_at__gte=start, reservation__created_at__lt=end
+            )
+
+        columns = {
+            "reservation_id": "reservation_id",
+            "reservation_created_at": "reservation__created_at",
+            "user_email": "reservation__user__email",
+            "ticket_id": "id",
+            "performance_id": "performance_id",
+            "show_time": "performance__show_time",
+            "play": "performance__play__title",
+            "theatre_hall": "performance__theatre_hall__name",
+            "row": "row",
+            "seat": "seat",
+        }
+        rows = tickets.values_list(*columns.values()).iterator(
+            chunk_size=settings.EXPORT_CHUNK_SIZE
+        )
+
+        def export_rows():
+            for row in rows:
+                item = dict(zip(columns, row))
+                for column in ("reservation_created_at", "show_time"):
+                    item[column] = datetime_to_representation(item[column])
+                yield item
+
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(export_rows()),
+            content_type=f"{renderer.media_type}; charset=utf-8",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="reservations-{month or "all"}.{renderer.format}"'
+        )
+        return response
+
+    def create(self, request, *args, **kwargs):
+        try:
+            return super().create(request, *args, **kwargs)
+        except SeatConflict as exc:
+            return seat_conflict_response(exc)
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        # The unique seat constraint is the source of truth, so the happy
+        # path does not pre-check seats. Taken seats are only looked up
+        # once an insert fails; if the conflicting ticket has disappeared
+        # meanwhile the reservation is simply retried.
+        tickets_data = serializer.validated_data["tickets"]
+        held_seats = SeatHold.held_seats(
+            tickets_data, exclude_user_id=self.request.user.id
+        )
+        if held_seats:
+            raise SeatConflict(held_seats)
+        for _ in range(settings.RESERVATION_CONFLICT_RETRIES + 1):
+            try:
+                serializer.save(user_id=self.request.user.id)
+                return
+            except IntegrityError:
+                taken_seats = Ticket.taken_seats(tickets_data)
+                if taken_seats:
+                    raise SeatConflict(taken_seats)
+        raise SeatConflict(
+            (ticket_data["performance"].id, ticket_data["row"], ticket_data["seat"])
+            for ticket_data in tickets_data
+        )
+
+
+class SeatHoldApiViewSet(
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Seats held for the user while they pay.
+
+    POST a list of seats to hold them for ``SEAT_HOLD_MINUTES``, DELETE a
+    hold to release it and POST ``confirm/`` to turn holds into a
+    reservation. A user holds at most ``SEAT_HOLD_MAX_SEATS`` seats of a
+    performance at a time.
+    """
+
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_serializer_class(self):
+        if self.action == "confirm":
+            return SeatHoldConfirmSerializer
+        return SeatHoldSerializer
+
+    def get_queryset(self):
+        return SeatHold.objects.active().filter(user_id=self.request.user.id)
+
+    @extend_schema(request=SeatHoldSerializer(many=True))
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.SEAT_HOLD_MAX_SEATS,
+        )
+        serializer.is_valid(raise_exception=True)
+        try:
+            self.perform_create(serializer)
+        except SeatConflict as exc:
+            return seat_conflict_response(exc)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_create(self, serializer):
+        # Sold seats can not be held; a held seat conflicts on the unique
+        # constraint, and if that hold has expired it is reaped and the
+        # insert retried once.
+        seats_data = serializer.validated_data
+        self.check_hold_limit(seats_data)
+        taken_seats = Ticket.taken_seats(seats_data)
+        if taken_seats:
+            raise SeatConflict(taken_seats)
+        for _ in range(2):
+            try:
+                with transaction.atomic():
+                    serializer.save(user_id=self.request.user.id)
+                return
+            except IntegrityError:
+                if not SeatHold.objects.expired().filter(
+                    seats_filter(seats_data)
+                ).delete()[0]:
+                    break
+        raise SeatConflict(
+            SeatHold.held_seats(seats_data)
+            or (
+                (seat_data["performance"].id, seat_data["row"], seat_data["seat"])
+                for seat_data in seats_data
+            )
+        )
+
+    def check_hold_limit(self, seats_data):
+        requested = Counter(seat_data["performance"].id for seat_data in seats_data)
+        held = dict(
+            self.get_queryset()
+            .filter(performance_id__in=requested)
+            .values_list("performance_id")
+            .annotate(Count("id"))
+        )
+        over_limit = sorted(
+            performance_id
+            for performance_id, count in requested.items()
+            if held.get(performance_id, 0) + count > settings.SEAT_HOLD_MAX_SEATS
+        )
+        if over_limit:
+            raise ValidationError(
+                {
+                    "non_field_errors": [
+                        f"Ensure you hold no more than "
+                        f"{settings.SEAT_HOLD_MAX_SEATS} seats of performance "
+                        f"{performance_id}."
+                        for performance_id in over_limit
+                    ]
+                }
+            )
+
+    def destroy(self, request, *args, **kwargs):
+        """Release the hold with a single DELETE."""
+        deleted, _ = self.get_queryset().filter(pk=kwargs["pk"]).delete()
+        if not deleted:
+            raise Http404
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(responses={201: ReservationSerializer})
+    @action(detail=False, methods=["post"])
+    def confirm(self, request):
+        """Turn active holds into a reservation, atomically."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        hold_ids = serializer.validated_data.get("holds")
+
+        with transaction.atomic():
+            # Locks only the user's hold rows, so other seats of the
+            # performance stay available.
+            holds = self.get_queryset().select_for_update()
+            if hold_ids is not None:
+                holds = holds.filter(id__in=hold_ids)
+            holds = list(holds.order_by("id"))
+            if not holds or (
+                hold_ids is not None and len(holds) != len(set(hold_ids))
+            ):
+                raise ValidationError(
+                    {"holds": "Some of the holds do not exist or have expired."}
+                )
+
+            seats_data = [
+                {"performance": hold.performance_id, "row": hold.row, "seat": hold.seat}
+                for hold in holds
+            ]
+            try:
+                with transaction.atomic():
+                    reservation = ReservationSerializer().create(
+                        {
+                            "user_id": request.user.id,
+                            "tickets": [
+                                {
+                                    "performance_id": hold.performance_id,
+                                    "row": hold.row,
+                                    "seat": hold.seat,
+                                }
+                                for hold in holds
+                            ],
+                        }
+                    )
+            except IntegrityError:
+                return seat_conflict_response(
+                    SeatConflict(Ticket.taken_seats(seats_data))
+                )
+            except SeatConflict as exc:
+                return seat_conflict_response(exc)
+            SeatHold.objects.filter(id__in=[hold.id for hold in holds]).delete()
+
+        return Response(
+            ReservationSerializer(reservation).data, status=status.HTTP_201_CREATED
+        )
+
+
+class CacheStatsView(generics.GenericAPIView):
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        return Response(get_stats())
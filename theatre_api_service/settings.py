@@ -2,6 +2,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework.permissions import IsAuthenticated
 
 
@@ -9,9 +10,27 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.environ["SECRET_KEY"]
 
-DEBUG = True
+# "production" turns off DEBUG and the debug toolbar and keeps database
+# connections open between requests; serve it with gunicorn.conf.py.
+DJANGO_ENVS = ("development", "production")
 
-ALLOWED_HOSTS = []
+DJANGO_ENV = os.environ.get("DJANGO_ENV", "development")
+
+if DJANGO_ENV not in DJANGO_ENVS:
+    raise ImproperlyConfigured(
+        f"DJANGO_ENV must be one of {', '.join(DJANGO_ENVS)}, not {DJANGO_ENV!r}"
+    )
+
+DEBUG = DJANGO_ENV == "development"
+
+# Comma separated host names; required in production, where an empty list
+# answers every request with 400.
+ALLOWED_HOSTS = [
+    host for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",") if host
+]
+
+if not DEBUG and not ALLOWED_HOSTS:
+    raise ImproperlyConfigured("DJANGO_ENV=production needs DJANGO_ALLOWED_HOSTS")
 
 
 INSTALLED_APPS = [
@@ -25,12 +44,10 @@ INSTALLED_APPS = [
     "drf_spectacular",
     "user",
     "theatre",
-    "debug_toolbar",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -38,12 +55,29 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(1, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.StatelessJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.AllowAny",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "theatre.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # Reverse proxies in front of the app whose X-Forwarded-For entries
+    # throttles may trust; 0 keys clients on REMOTE_ADDR alone.
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
+    # Token buckets for /api/user/token/, see user/throttling.py.
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": os.environ.get("LOGIN_IP_THROTTLE_RATE", "30/min"),
+        "login_email": os.environ.get("LOGIN_EMAIL_THROTTLE_RATE", "10/min"),
+    },
 }
 
 SPECTACULAR_SETTINGS = {
@@ -61,6 +95,8 @@ ROOT_URLCONF = "theatre_api_service.urls"
 
 AUTH_USER_MODEL = "user.User"
 
+AUTHENTICATION_BACKENDS = ["user.backends.EmailBackend"]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -86,9 +122,28 @@ DATABASES = {
         "NAME": os.environ["POSTGRES_DB"],
         "USER": os.environ["POSTGRES_USER"],
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
+        # Seconds a worker reuses its connection (0 closes it per request).
+        "CONN_MAX_AGE": int(os.environ.get("CONN_MAX_AGE", 0 if DEBUG else 60)),
+        "CONN_HEALTH_CHECKS": not DEBUG,
     }
 }
 
+# Production runs several gunicorn workers, which must share one cache
+# (gunicorn.conf.py refuses to start them on LocMemCache).
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -105,6 +160,35 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# argon2 (needs argon2-cffi), bcrypt (needs bcrypt) or pbkdf2 hashes new
+# passwords; the others still verify existing hashes. See user/hashers.py.
+PASSWORD_HASHER = os.environ.get("PASSWORD_HASHER", "pbkdf2")
+
+_PASSWORD_HASHER_CLASSES = {
+    "argon2": "user.hashers.Argon2PasswordHasher",
+    "bcrypt": "user.hashers.BCryptSHA256PasswordHasher",
+    "pbkdf2": "user.hashers.PBKDF2PasswordHasher",
+}
+
+PASSWORD_HASHERS = [_PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    hasher
+    for name, hasher in _PASSWORD_HASHER_CLASSES.items()
+    if name != PASSWORD_HASHER
+]
+
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.environ.get("PASSWORD_PBKDF2_ITERATIONS", 600_000)
+)
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get("PASSWORD_ARGON2_TIME_COST", 2))
+PASSWORD_ARGON2_MEMORY_COST = int(
+    os.environ.get("PASSWORD_ARGON2_MEMORY_COST", 102_400)
+)
+PASSWORD_BCRYPT_ROUNDS = int(os.environ.get("PASSWORD_BCRYPT_ROUNDS", 12))
+
+# Hash passwords on a pool of this many threads (0 hashes inline) with at
+# most PASSWORD_HASHING_QUEUE waiting; more concurrent hashes get a 503.
+PASSWORD_HASHING_THREADS = int(os.environ.get("PASSWORD_HASHING_THREADS", 0))
+PASSWORD_HASHING_QUEUE = int(os.environ.get("PASSWORD_HASHING_QUEUE", 32))
 
 LANGUAGE_CODE = "en-us"
 
@@ -116,14 +200,56 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Filled by manage.py collectstatic. gunicorn does not serve these files:
+# with DEBUG off, point the reverse proxy (or a CDN) at this directory for
+# STATIC_URL, or the admin and browsable API render without their assets.
+STATIC_ROOT = os.environ.get("STATIC_ROOT", BASE_DIR / "staticfiles")
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_USER_CLASS": "user.authentication.ClaimsUser",
 }
 
+# Seconds a process trusts a user's is_active flag with stateless JWTs.
+JWT_ACTIVE_USER_CACHE_TIMEOUT = 60
+
+RESERVATION_CONFLICT_RETRIES = 2
+
+# Keep a row per seat of every performance (theatre.models.PerformanceSeat).
+# Build it for existing performances with manage.py build_seat_inventory.
+SEAT_INVENTORY = os.environ.get("SEAT_INVENTORY") == "1"
+
+# none, advisory, performance or seats (needs SEAT_INVENTORY);
+# see theatre/locking.py.
+RESERVATION_LOCKING = os.environ.get("RESERVATION_LOCKING", "none")
+
+SEAT_HOLD_MINUTES = 10
+
+# Seats one user may hold per performance, within one request or across
+# their active holds.
+SEAT_HOLD_MAX_SEATS = 10
+
+SEAT_MAP_CACHE_TIMEOUT = 60 * 5
+
+PAGINATION_COUNT_CACHE_TIMEOUT = 30
+
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = 100_000
+
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+EXPORT_CHUNK_SIZE = 2000
+
+BULK_MAX_ITEMS = 500
+
+# Serve the play, performance and reservation lists from .values() rows
+# (theatre/fast_serializers.py) instead of the DRF serializers.
+FAST_READ_SERIALIZERS = os.environ.get("FAST_READ_SERIALIZERS") == "1"
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
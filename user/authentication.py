@@ -0,0 +1,84 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+
+
+class ClaimsUser(TokenUser):
+    """User built from the ``user_id``, ``email`` and ``is_staff`` token claims.
+
+    It is not a model instance: filter and assign by ``request.user.id``
+    (``user_id=...``) instead of passing the user itself to the ORM.
+    """
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    def __str__(self):
+        return self.email
+
+
+class ActiveUserCache:
+    """Per-process ``is_active`` and ``is_staff`` flags that expire after
+    ``JWT_ACTIVE_USER_CACHE_TIMEOUT`` seconds.
+
+    Deactivating or demoting a user takes effect within the timeout
+    instead of when their token expires, for one query per user and period.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get_flags(self, user_id):
+        """``(is_active, is_staff)`` of the user, both False if it is gone."""
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        flags = (
+            get_user_model()
+            .objects.filter(id=user_id)
+            .values_list("is_active", "is_staff")
+            .first()
+        ) or (False, False)
+        with self._lock:
+            self._entries[user_id] = (
+                flags,
+                now + settings.JWT_ACTIVE_USER_CACHE_TIMEOUT,
+            )
+        return flags
+
+    def is_active(self, user_id):
+        return self.get_flags(user_id)[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+active_users = ActiveUserCache()
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """``JWTAuthentication`` without loading the ``User`` row per request.
+
+    ``request.user`` is a ``ClaimsUser``. Views needing the full model, such
+    as ``ManageUserView``, keep ``JWTAuthentication``.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        is_active, is_staff = active_users.get_flags(user.id)
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        # The claim is as old as the token; trust the database's flag.
+        user.is_staff = is_staff
+        return user
@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models.functions import Lower
+
+
+def get_user_by_email(email):
+    """Return the user with ``email`` in any case, or None.
+
+    Filters on ``lower(email)`` so the lookup uses ``user_email_lower_idx``.
+    Should older accounts differ only by case, the exact match wins.
+    """
+    email = email.strip()
+    users = list(
+        get_user_model()
+        .objects.alias(email_lower=Lower("email"))
+        .filter(email_lower=email.lower())
+    )
+    if len(users) == 1:
+        return users[0]
+    return next((user for user in users if user.email == email), None)
+
+
+class EmailBackend(ModelBackend):
+    """Authenticate by email, ignoring case and surrounding whitespace."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = get_user_by_email(username)
+        if user is None:
+            # Hash anyway, like ModelBackend, so unknown emails take as long.
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
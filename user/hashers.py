@@ -0,0 +1,132 @@
+"""Password hashers with their cost taken from settings, and pooled hashing.
+
+``PASSWORD_HASHER`` picks the hasher new passwords use; the others stay in
+``PASSWORD_HASHERS`` to verify existing hashes. When the hasher or its cost
+changes, Django rehashes a password the next time its user logs in.
+
+With ``PASSWORD_HASHING_THREADS`` set, ``User.set_password`` and
+``User.check_password`` (registration, password changes, logins, and the
+dummy hash ``EmailBackend`` computes for unknown emails) hash on one
+bounded thread pool: at most that many hashes run at once and at most
+``PASSWORD_HASHING_QUEUE`` more wait, beyond which the request is answered
+with 503 instead of piling up on the CPU. argon2 and bcrypt release the
+GIL while hashing.
+
+The pool bounds hashing work, not request workers: the request thread
+still waits for its hash, so a worker busy with a login is not free to
+serve other requests meanwhile.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core import checks
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+HASHER_LIBRARIES = {"argon2": "argon2", "bcrypt": "bcrypt"}
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    @property
+    def rounds(self):
+        return settings.PASSWORD_BCRYPT_ROUNDS
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many password changes at once, try again shortly."
+    default_code = "hashing_busy"
+
+
+class HashingPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+
+    def _start(self):
+        with self._lock:
+            if self._executor is None:
+                threads = settings.PASSWORD_HASHING_THREADS
+                self._slots = threading.BoundedSemaphore(
+                    threads + settings.PASSWORD_HASHING_QUEUE
+                )
+                self._executor = ThreadPoolExecutor(
+                    threads, thread_name_prefix="password-hashing"
+                )
+
+    def run(self, func, *args):
+        """Return ``func(*args)`` computed on the pool, or raise HashingBusy."""
+        if self._executor is None:
+            self._start()
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def make_password(self, raw_password):
+        return self.run(hashers.make_password, raw_password)
+
+
+pool = HashingPool()
+
+
+def make_password(raw_password):
+    """``make_password``, run on the hashing pool when one is configured."""
+    if raw_password is None or not settings.PASSWORD_HASHING_THREADS:
+        return hashers.make_password(raw_password)
+    return pool.make_password(raw_password)
+
+
+def check_password(raw_password, encoded, setter=None):
+    """``check_password``, verified on the hashing pool when one is configured.
+
+    ``setter`` runs on the request thread, so a rehash takes its own pool
+    slot instead of waiting on the pool from one of its threads.
+    """
+    if not settings.PASSWORD_HASHING_THREADS:
+        return hashers.check_password(raw_password, encoded, setter)
+    must_update = []
+    is_correct = pool.run(
+        hashers.check_password, raw_password, encoded, must_update.append
+    )
+    if setter and must_update:
+        setter(raw_password)
+    return is_correct
+
+
+def check_hasher_library(app_configs, **kwargs):
+    library = HASHER_LIBRARIES.get(settings.PASSWORD_HASHER)
+    if library is None:
+        return []
+    try:
+        __import__(library)
+    except ImportError:
+        return [
+            checks.Error(
+                f"PASSWORD_HASHER={settings.PASSWORD_HASHER} needs the "
+                f"{library!r} package.",
+                id="user.E001",
+            )
+        ]
+    return []
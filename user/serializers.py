@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from user.backends import get_user_by_email
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -9,6 +12,15 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ("is_staff",)
         extra_kwargs = {"password": {"write_only": True, "min_length": 5}}
 
+    def validate_email(self, value):
+        """Reject emails that differ from an existing one only by case"""
+        user = get_user_by_email(value)
+        if user is not None and user != self.instance:
+            raise serializers.ValidationError(
+                "user with this email address already exists."
+            )
+        return value
+
     def create(self, validated_data):
         """Create a new user with encrypted password and return it"""
         return get_user_model().objects.create_user(**validated_data)
@@ -22,3 +34,14 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Adds the claims ``StatelessJWTAuthentication`` builds the user from."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["email"] = user.email
+        token["is_staff"] = user.is_staff
+        return token
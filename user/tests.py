@@ -1,3 +1,315 @@
+import importlib.util
+import threading
+import unittest
+from unittest import mock
+
+from django.contrib.auth import get_user_model, hashers
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from theatre.models import Performance, Play, Reservation, TheatreHall
+from user.authentication import active_users
+from user.hashers import check_hasher_library, HashingPool
+from user.throttling import LoginEmailThrottle, LoginIPThrottle
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+ME_URL = reverse("user:manage")
+REGISTER_URL = reverse("user:create")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        active_users.clear()
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="userpass"
+        )
+        response = self.client.post(
+            TOKEN_URL, {"email": "user@example.com", "password": "userpass"}
+        )
+        self.access = response.data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            query["sql"] for query in context.captured_queries
+            if 'FROM "user_user"' in query["sql"]
+        ]
+
+    def test_token_claims(self):
+        token = AccessToken(self.access)
+        self.assertEqual(token["user_id"], self.user.id)
+        self.assertEqual(token["email"], "user@example.com")
+        self.assertFalse(token["is_staff"])
+
+    def test_user_row_is_not_loaded_per_request(self):
+        self.assertEqual(len(self.user_queries(RESERVATION_URL)), 1)
+        self.assertEqual(self.user_queries(RESERVATION_URL), [])
+
+    def test_manage_user_view_loads_the_user(self):
+        self.user_queries(RESERVATION_URL)
+        self.assertEqual(len(self.user_queries(ME_URL)), 1)
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.data["email"], "user@example.com")
+
+    def test_reservation_with_stateless_user(self):
+        theatre_hall = TheatreHall.objects.create(name="Main Hall", rows=10, seats_in_row=20)
+        play = Play.objects.create(title="Hamlet", description="A classic tragedy")
+        performance = Performance.objects.create(
+            play=play, theatre_hall=theatre_hall, show_time="2023-09-10T14:30:00Z"
+        )
+        response = self.client.post(
+            RESERVATION_URL,
+            {"tickets": [{"row": 1, "seat": 1, "performance": performance.id}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.get().user, self.user)
+        response = self.client.get(RESERVATION_URL)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_inactive_user_rejected_once_cache_expires(self):
+        self.client.get(RESERVATION_URL)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(RESERVATION_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.settings(JWT_ACTIVE_USER_CACHE_TIMEOUT=0):
+            active_users.clear()
+            response = self.client.get(RESERVATION_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_admin_only_endpoint_uses_is_staff_claim(self):
+        response = self.client.get(reverse("theatre:cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_demoted_admin_rejected_once_cache_expires(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.post(
+            TOKEN_URL, {"email": "user@example.com", "password": "userpass"}
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        active_users.clear()
+        response = self.client.get(reverse("theatre:cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.user.is_staff = False
+        self.user.save()
+        with self.settings(JWT_ACTIVE_USER_CACHE_TIMEOUT=0):
+            active_users.clear()
+            response = self.client.get(reverse("theatre:cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class PasswordHashingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def register(self):
+        return self.client.post(
+            REGISTER_URL, {"email": "user@example.com", "password": "userpass"}
+        )
+
+    def test_hasher_cost_from_settings(self):
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            response = self.register()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = get_user_model().objects.get()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+
+    def test_rehash_on_login(self):
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.register()
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            response = self.client.post(
+                TOKEN_URL, {"email": "user@example.com", "password": "userpass"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user = get_user_model().objects.get()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
+        self.assertTrue(user.check_password("userpass"))
+
+    @mock.patch("user.hashers.pool", new_callable=HashingPool)
+    def test_hashing_on_thread_pool(self, pool):
+        threads = []
+        make_password = hashers.make_password
+
+        def spy(raw_password):
+            threads.append(threading.current_thread().name)
+            return make_password(raw_password)
+
+        with self.settings(PASSWORD_HASHING_THREADS=2), mock.patch.object(
+            hashers, "make_password", side_effect=spy
+        ):
+            response = self.register()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("password-hashing"))
+        self.assertTrue(get_user_model().objects.get().check_password("userpass"))
+
+    @mock.patch("user.hashers.pool", new_callable=HashingPool)
+    def test_hashing_pool_full(self, pool):
+        with self.settings(PASSWORD_HASHING_THREADS=1, PASSWORD_HASHING_QUEUE=0):
+            pool._start()
+            pool._slots.acquire()
+            response = self.register()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(get_user_model().objects.exists())
+
+    @mock.patch("user.hashers.pool", new_callable=HashingPool)
+    def test_password_update_uses_pool(self, pool):
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="userpass"
+        )
+        self.client.force_authenticate(user)
+        with self.settings(PASSWORD_HASHING_THREADS=1):
+            response = self.client.patch(ME_URL, {"password": "newpass"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(pool._executor)
+        user.refresh_from_db()
+        self.assertTrue(user.check_password("newpass"))
+
+    @mock.patch("user.hashers.pool", new_callable=HashingPool)
+    def test_login_verifies_on_pool(self, pool):
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.register()
+        threads = []
+        check_password = hashers.check_password
+
+        def spy(*args):
+            threads.append(threading.current_thread().name)
+            return check_password(*args)
+
+        with self.settings(
+            PASSWORD_HASHING_THREADS=1, PASSWORD_PBKDF2_ITERATIONS=2000
+        ), mock.patch.object(hashers, "check_password", side_effect=spy):
+            response = self.client.post(
+                TOKEN_URL, {"email": "user@example.com", "password": "userpass"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("password-hashing"))
+        # The rehash on login went through the pool as well.
+        user = get_user_model().objects.get()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
+
+    @mock.patch("user.hashers.pool", new_callable=HashingPool)
+    def test_login_pool_full(self, pool):
+        self.register()
+        with self.settings(PASSWORD_HASHING_THREADS=1, PASSWORD_HASHING_QUEUE=0):
+            pool._start()
+            pool._slots.acquire()
+            response = self.client.post(
+                TOKEN_URL, {"email": "user@example.com", "password": "userpass"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    @unittest.skipIf(importlib.util.find_spec("argon2"), "argon2-cffi is installed")
+    def test_missing_hasher_library_is_reported(self):
+        with self.settings(PASSWORD_HASHER="argon2"):
+            errors = check_hasher_library(None)
+        self.assertEqual([error.id for error in errors], ["user.E001"])
+
+
+class TokenObtainTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="User@example.com", password="userpass"
+        )
+
+    def obtain(self, email, password="userpass", ip="10.0.0.1"):
+        return self.client.post(
+            TOKEN_URL, {"email": email, "password": password}, REMOTE_ADDR=ip
+        )
+
+    def test_email_is_case_insensitive(self):
+        for email in ("User@example.com", "user@EXAMPLE.com", " user@example.com"):
+            with self.subTest(email=email):
+                response = self.obtain(email)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(AccessToken(response.data["access"])["user_id"], self.user.id)
+
+    def test_lookup_uses_lower_email(self):
+        with CaptureQueriesContext(connection) as context:
+            self.obtain("USER@example.com")
+        lookup = context.captured_queries[0]["sql"]
+        self.assertIn('LOWER("user_user"."email")', lookup)
+
+    def test_wrong_password(self):
+        response = self.obtain("user@example.com", password="wrong")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_body_is_rejected(self):
+        response = self.client.post(
+            TOKEN_URL, [{"email": "user@example.com"}], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_register_rejects_email_differing_by_case(self):
+        response = self.client.post(
+            REGISTER_URL, {"email": "USER@example.com", "password": "userpass"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", response.data)
+
+    @mock.patch.object(LoginEmailThrottle, "THROTTLE_RATES", {"login_email": "3/min"})
+    def test_throttle_per_email(self):
+        for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+            self.obtain("user@example.com", password="wrong", ip=ip)
+        response = self.obtain("USER@example.com", ip="10.0.0.4")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "20")
+        response = self.obtain("other@example.com", password="wrong", ip="10.0.0.4")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch.object(LoginIPThrottle, "THROTTLE_RATES", {"login_ip": "3/min"})
+    def test_throttle_per_ip(self):
+        for i in range(3):
+            self.obtain(f"user{i}@example.com", password="wrong")
+        response = self.obtain("user@example.com")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.obtain("user@example.com", ip="10.0.0.2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @mock.patch.object(LoginIPThrottle, "THROTTLE_RATES", {"login_ip": "3/min"})
+    def test_throttle_per_ip_ignores_spoofed_forwarded_for(self):
+        for i in range(3):
+            self.client.post(
+                TOKEN_URL,
+                {"email": f"user{i}@example.com", "password": "wrong"},
+                REMOTE_ADDR="10.0.0.1",
+                HTTP_X_FORWARDED_FOR=f"192.0.2.{i}",
+            )
+        response = self.client.post(
+            TOKEN_URL,
+            {"email": "user@example.com", "password": "userpass"},
+            REMOTE_ADDR="10.0.0.1",
+            HTTP_X_FORWARDED_FOR="192.0.2.99",
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
 
-# Create your tests here.
+    @mock.patch.object(LoginIPThrottle, "THROTTLE_RATES", {"login_ip": "2/min"})
+    def test_bucket_refills(self):
+        with mock.patch.object(LoginIPThrottle, "timer", return_value=1000.0):
+            for _ in range(2):
+                self.assertEqual(self.obtain("user@example.com").status_code, 200)
+            self.assertEqual(self.obtain("user@example.com").status_code, 429)
+        with mock.patch.object(LoginIPThrottle, "timer", return_value=1030.0):
+            self.assertEqual(self.obtain("user@example.com").status_code, 200)
+            self.assertEqual(self.obtain("user@example.com").status_code, 429)
@@ -0,0 +1,65 @@
+import hashlib
+from collections.abc import Mapping
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Token bucket with ``num_requests`` burst refilled over ``duration``.
+
+    Unlike ``SimpleRateThrottle``, which keeps a timestamp per request,
+    the cache holds one ``(tokens, updated_at)`` pair per key, so every
+    check is one get and one set whatever the rate. The read and write are
+    not atomic: concurrent requests may occasionally share a token.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        tokens, updated_at = self.cache.get(self.key, (self.num_requests, self.now))
+        refill = (self.now - updated_at) * self.num_requests / self.duration
+        self.tokens = min(self.num_requests, tokens + refill)
+        if self.tokens < 1:
+            return self.throttle_failure()
+        self.tokens -= 1
+        # A bucket left alone for ``duration`` is full again, like a missing one.
+        self.cache.set(self.key, (self.tokens, self.now), self.duration)
+        return self.throttle_success()
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    """Limit token requests per client IP."""
+
+    scope = "login_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class LoginEmailThrottle(TokenBucketThrottle):
+    """Limit token requests per email, from whichever IPs they come."""
+
+    scope = "login_email"
+
+    def get_cache_key(self, request, view):
+        if not isinstance(request.data, Mapping):
+            return None
+        email = request.data.get("email")
+        if not isinstance(email, str) or not email.strip():
+            return None
+        digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": digest}
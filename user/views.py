@@ -1,8 +1,10 @@
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.views import TokenObtainPairView
 
 from user.serializers import UserSerializer
+from user.throttling import LoginEmailThrottle, LoginIPThrottle
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -16,3 +18,7 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
 
     def get_object(self):
         return self.request.user
+
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    throttle_classes = (LoginIPThrottle, LoginEmailThrottle)